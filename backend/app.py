@@ -1,41 +1,254 @@
-from fastapi import FastAPI, HTTPException, status, Depends,Request
+from fastapi import FastAPI, HTTPException, status, Depends,Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+
 import requests
 
+from core.cache import Generations, TTLCache, key_namespace
+from core.registry import ClientRegistry
+from core.session import AsanaSession, DEFAULT_POOL_SIZE
+from core.singleflight import SingleFlight
+from core.sync import ProjectSnapshot, SnapshotStore, SyncTokenExpired
+from core.insights import spiked_insights as compute_spiked_insights
+from core.metrics import MetricsMiddleware, bind_request, log_sample, metrics
+from core.prefetch import PREFETCH_ENABLED, Prefetcher
+from core.ratelimit import BULK, RateLimiterRegistry, TokenBucket, at_priority, priority
+from core.responses import EncodedBody, EncodedResponseCache, dumps, encoded_json_response
+from core.task_persistence import PersistentTaskStore, create_task_backend
+from core.task_store import SORTABLE_COLUMNS
+from core.tasks import NOT_SET, UNASSIGNED, TaskRecord, parse_due_date
 # from postgrest import APIError
 # from core.config import get_g_vars
 # from core.dependencies import get_user_id_from_token
 
-
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=os.getenv("ASANA_LOG_LEVEL", "INFO").upper())
 
 
 BASE_URL = "https://app.asana.com/api/1.0"
 
+# Max number of task detail requests in flight at once per client
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("ASANA_MAX_CONCURRENCY", "8"))
+
+# Worker threads that run blocking Asana I/O off the event loop
+ASANA_IO_WORKERS = int(os.getenv("ASANA_IO_WORKERS", "32"))
+
+# Reload projects incrementally from Asana events by default
+INCREMENTAL_SYNC = os.getenv("ASANA_INCREMENTAL_SYNC", "false").lower() in ("1", "true", "yes")
+
+# Send task updates through Asana's /batch endpoint, falling back to one call per task
+BATCH_WRITES = os.getenv("ASANA_BATCH_WRITES", "true").lower() in ("1", "true", "yes")
+# Most actions Asana accepts in one /batch request
+MAX_BATCH_ACTIONS = 10
+
+# Notes kept from task loads so the write path can skip re-reading them
+NOTES_LEDGER_SIZE = int(os.getenv("ASANA_NOTES_LEDGER_SIZE", "20000"))
+NOTES_LEDGER_TTL = float(os.getenv("ASANA_NOTES_LEDGER_TTL", "600"))
+
+# Seconds a validated (or rejected) API key is trusted without calling /users/me again
+AUTH_CACHE_TTL = float(os.getenv("ASANA_AUTH_CACHE_TTL", "300"))
+AUTH_NEGATIVE_TTL = float(os.getenv("ASANA_AUTH_NEGATIVE_TTL", "30"))
+
+# Largest page size the Asana list endpoints accept
+MAX_PAGE_SIZE = 100
+
+# Task fields read by format_task, so list calls can return them via opt_fields
+FORMAT_TASK_FIELDS = (
+    "name",
+    "assignee.name",
+    "custom_fields.name",
+    "custom_fields.display_value",
+    "followers.name",
+    "due_on",
+    "notes",
+    "permalink_url",
+)
+
+
+def build_opt_fields(fields) -> str:
+    """Join field paths into an Asana opt_fields query value."""
+    return ",".join(dict.fromkeys(fields))
+
+
+# Process-wide response cache shared by all clients, namespaced per API key
+response_cache = TTLCache()
+
+# Task writes per API key namespace; a project load spanning one is not cached
+task_writes = Generations()
+
+# Upstream fetches in progress, keyed like response_cache, so identical concurrent
+# requests (other tabs, other sessions of the same key) share one fetch
+inflight = SingleFlight()
+
+# Client-side token buckets, one per API key, that every Asana call waits on
+rate_limiters = RateLimiterRegistry()
+
+# /users/me payloads of validated API keys (False for rejected ones), keyed by key hash
+validation_cache = TTLCache(maxsize=1024, ttls={"auth": AUTH_CACHE_TTL})
+
+# /users/me fields kept after login; workspaces are reused for the first workspace listing
+USER_ME_FIELDS = ("name", "email", "workspaces.name", "workspaces.resource_type")
+
+# Per-project task snapshots used by incremental sync
+project_snapshots = SnapshotStore()
+
+# Task notes from the last load, plus the events sync token of the project they came from
+notes_ledger = TTLCache(
+    maxsize=NOTES_LEDGER_SIZE,
+    ttls={"notes": NOTES_LEDGER_TTL, "notes_sync": NOTES_LEDGER_TTL},
+)
+
+# Event actions that add a task to, or drop it from, a project's task list
+TASK_ADDED_ACTIONS = {"added", "undeleted"}
+TASK_REMOVED_ACTIONS = {"removed", "deleted"}
+
 class AsanaClient_mod:
-    def __init__(self, api_key: str):
-        self.headers = {"Authorization": f"Bearer {api_key}"}
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        bulk_projection: bool = True,
+        page_size: int = MAX_PAGE_SIZE,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        cache: Optional[TTLCache] = None,
+        incremental_sync: bool = INCREMENTAL_SYNC,
+        batch_writes: bool = BATCH_WRITES,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
+        self.cache_namespace = key_namespace(api_key)
+        # Shared with every other client of this API key unless one is given
+        self.rate_limiter = rate_limiters.get(self.cache_namespace) if rate_limiter is None else rate_limiter
+        # Pooled keep-alive session shared by every call this client makes
+        self.session = AsanaSession(api_key, pool_size=max(pool_size, max_concurrency), limiter=self.rate_limiter)
+        self.cache = response_cache if cache is None else cache
+        # /users/me payload from the last successful validation
+        self.user: Optional[dict] = None
+        self.max_concurrency = max(1, max_concurrency)
+        # Load tasks through opt_fields on the list endpoint instead of one call per task
+        self.bulk_projection = bulk_projection
+        self.page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+        # Reload projects from a local snapshot plus Asana events instead of a full fetch
+        self.incremental_sync = incremental_sync
+        self.batch_writes = batch_writes
+
+    # -------------------
+    # Pagination
+    # -------------------
+    def iter_pages(self, path: str, params: Optional[dict] = None) -> Iterator[List[dict]]:
+        """Yield each page of a list endpoint, following next_page.offset."""
+        url = f"{BASE_URL}{path}"
+        params = dict(params or {})
+        params.setdefault("limit", self.page_size)
+
+        while True:
+            response = self.session.get(url, params=params)
+            # Retries are used up by now; a failed page must not read as the last one
+            response.raise_for_status()
+            res = response.json()
+            yield res.get("data", [])
+
+            offset = (res.get("next_page") or {}).get("offset")
+            if not offset:
+                return
+            params["offset"] = offset
+
+    def iter_records(self, path: str, params: Optional[dict] = None) -> Iterator[dict]:
+        """Yield every record of a list endpoint, one page at a time."""
+        for page in self.iter_pages(path, params):
+            yield from page
+
+    # -------------------
+    # Cache
+    # -------------------
+    def cache_key(self, resource: str, *args) -> tuple:
+        return (self.cache_namespace, resource, *args)
+
+    def cached(self, resource: str, *args, loader):
+        """Return a cached copy of a list resource, loading it on a miss.
+
+        Concurrent misses for the same key share one load.
+        """
+        key = self.cache_key(resource, *args)
+        value = self.cache.get(key)
+        if value is None:
+            # The load caches its result before the flight ends, so no caller slips between them
+            value = inflight.do(key, lambda: self.cache.get_or_load(key, loader))
+        return list(value)
+
+    def invalidate_task(self, task_gid: str):
+        """Drop a task's known notes and every cached project list containing it.
+
+        Loads already running may predate the change: later callers start new
+        ones instead of joining them, and the bumped task_writes generation
+        keeps their results out of the cache and the notes ledger.
+        """
+        task_writes.bump(self.cache_namespace)
+        inflight.forget(self.cache_key("task", task_gid))
+        inflight.forget_where(lambda key: key[:2] == (self.cache_namespace, "tasks"))
+        notes_ledger.invalidate(self.cache_key("notes", task_gid))
+        self.cache.invalidate_where(
+            lambda key, tasks: key[:2] == (self.cache_namespace, "tasks")
+            and any(t.get("ID") == task_gid for t in tasks)
+        )
 
     # -------------------
     # Validate API Key
     # -------------------
     def validate_api_key(self):
-        """Validate the API key by attempting to fetch user info"""
+        """Validate the API key by attempting to fetch user info.
+
+        Results are cached by key hash: accepted keys for AUTH_CACHE_TTL,
+        rejected ones (401/403) for AUTH_NEGATIVE_TTL. The user's workspaces
+        from /users/me also seed the workspaces cache.
+        """
+        key = self.cache_key("auth")
+        cached = validation_cache.get(key)
+        if cached is not None:
+            if cached is False:
+                return False
+            self.user = cached
+            return True
+
         try:
             url = f"{BASE_URL}/users/me"
-            response = requests.get(url, headers=self.headers)
-            return response.status_code == 200
+            response = self.session.get(url, params={"opt_fields": build_opt_fields(USER_ME_FIELDS)})
         except:
             return False
 
+        if response.status_code in (401, 403):
+            validation_cache.set(key, False, ttl=AUTH_NEGATIVE_TTL)
+            return False
+        if response.status_code != 200:
+            return False
+
+        self.user = response.json().get("data", {})
+        validation_cache.set(key, self.user)
+        if "workspaces" in self.user:
+            workspaces = [self.format_workspace(ws) for ws in self.user["workspaces"]]
+            self.cache.set(self.cache_key("workspaces"), workspaces)
+        return True
+
     # -------------------
     # Workspaces
     # -------------------
     def get_workspaces(self):
-        url = f"{BASE_URL}/workspaces"
-        res = requests.get(url, headers=self.headers).json()
-        return [self.format_workspace(ws) for ws in res.get("data", [])]
+        return self.cached("workspaces", loader=lambda: list(self.iter_workspaces()))
+
+    def iter_workspaces(self) -> Iterator[dict]:
+        for ws in self.iter_records("/workspaces"):
+            yield self.format_workspace(ws)
 
     def format_workspace(self, ws: dict) -> dict:
         return {
@@ -48,9 +261,11 @@ class AsanaClient_mod:
     # Projects
     # -------------------
     def get_projects(self, workspace_gid: str):
-        url = f"{BASE_URL}/projects?workspace={workspace_gid}"
-        res = requests.get(url, headers=self.headers).json()
-        return [self.format_project(p) for p in res.get("data", [])]
+        return self.cached("projects", workspace_gid, loader=lambda: list(self.iter_projects(workspace_gid)))
+
+    def iter_projects(self, workspace_gid: str) -> Iterator[dict]:
+        for p in self.iter_records("/projects", {"workspace": workspace_gid}):
+            yield self.format_project(p)
 
     def format_project(self, project: dict) -> dict:
         return {
@@ -63,23 +278,269 @@ class AsanaClient_mod:
     # Tasks
     # -------------------
 
-    def get_tasks(self, project_gid: str):
-        """Fetch all tasks for a given project with full details."""
-        url = f"{BASE_URL}/projects/{project_gid}/tasks"
-        res = requests.get(url, headers=self.headers).json()
-
+    def get_tasks(
+        self,
+        project_gid: str,
+        bulk: Optional[bool] = None,
+        incremental: Optional[bool] = None,
+        remember_notes: bool = True,
+    ):
+        """Fetch all tasks for a given project with full details.
+
+        In bulk mode the list endpoint returns every field format_task needs,
+        so a project loads in one request per page. Otherwise each task is
+        fetched individually through fetch_task_details. In incremental mode
+        only tasks changed since the last load are fetched (see sync_tasks).
+        Concurrent calls for the same project share one load. Loads whose
+        rows will not be written back (streams, prefetch, indexing) pass
+        remember_notes=False and skip the write path's events sync token.
+        """
+        return list(self.get_tasks_snapshot(project_gid, bulk, incremental, remember_notes))
+
+    def get_tasks_snapshot(
+        self,
+        project_gid: str,
+        bulk: Optional[bool] = None,
+        incremental: Optional[bool] = None,
+        remember_notes: bool = True,
+    ) -> List[dict]:
+        """Like get_tasks, but return the cached list itself; callers must not modify it.
+
+        Cached lists are replaced rather than changed, so the same list object
+        means the same tasks.
+        """
+        key = self.cache_key("tasks", project_gid)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        def load():
+            tasks = list(self.iter_tasks(project_gid, bulk, incremental, remember_notes))
+            # Hand back the list the cache holds so the next call sees the same snapshot
+            return self.cache.get(key) or tasks
+
+        return inflight.do(key, load)
+
+    def iter_tasks(
+        self,
+        project_gid: str,
+        bulk: Optional[bool] = None,
+        incremental: Optional[bool] = None,
+        remember_notes: bool = True,
+    ) -> Iterator[dict]:
+        """Yield formatted tasks for a project page by page, as each page arrives.
+
+        Served from the cache when the project is fresh there. Only a complete
+        upstream pass is stored for later calls: a failed page or task read
+        raises, a consumer that stops early leaves the cache untouched, and a
+        pass that overlapped a task write is not stored (see cache_tasks).
+        """
+        key = self.cache_key("tasks", project_gid)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield from cached
+            return
+
+        generation = task_writes.get(self.cache_namespace)
+        if incremental is None:
+            incremental = self.incremental_sync
+        if incremental:
+            tasks = self.sync_tasks(project_gid, bulk)
+            snapshot = project_snapshots.get(self.cache_key("snapshot", project_gid))
+            self.cache_tasks(project_gid, tasks, snapshot.sync_token if snapshot else None, generation)
+            yield from tasks
+            return
+
+        # A token older than the fetch lets the write path spot notes edited after it
+        sync_token = self.notes_sync_token(project_gid) if remember_notes else None
         tasks = []
-        for t in res.get("data", []):
-            # get full task details by gid
-            details = self.get_task_details(t["gid"])
-            tasks.append(details)
+        for task in self.fetch_tasks(project_gid, bulk):
+            tasks.append(task)
+            yield task
+        self.cache_tasks(project_gid, tasks, sync_token, generation)
+
+    def cache_tasks(self, project_gid: str, tasks: List[dict], sync_token: Optional[str], generation: int):
+        """Store a finished project load unless a task write landed since it started.
+
+        generation is the task_writes count read before the fetch. A write
+        between the first check and the set is caught by the second one; a
+        later write invalidates the entry itself.
+        """
+        if task_writes.get(self.cache_namespace) != generation:
+            logger.debug("Tasks of project %s changed during the load; not caching it", project_gid)
+            return
+        key = self.cache_key("tasks", project_gid)
+        self.remember_notes(project_gid, tasks, sync_token)
+        self.cache.set(key, tasks)
+        if task_writes.get(self.cache_namespace) != generation:
+            self.cache.invalidate(key)
+
+    def fetch_tasks(self, project_gid: str, bulk: Optional[bool] = None) -> Iterator[dict]:
+        """Yield formatted tasks for a project straight from the API."""
+        if bulk is None:
+            bulk = self.bulk_projection
+        path = f"/projects/{project_gid}/tasks"
+
+        if bulk:
+            params = {"opt_fields": build_opt_fields(FORMAT_TASK_FIELDS)}
+            for t in self.iter_records(path, params):
+                yield self.format_task(t, t.get("gid"))
+            return
+
+        for page in self.iter_pages(path):
+            for task in self.iter_tasks_details([t["gid"] for t in page]):
+                # None: deleted since the page was listed
+                if task is not None:
+                    yield task
+
+    def iter_tasks_details(self, task_gids: List[str]) -> Iterator[Optional[dict]]:
+        """Yield task details in input order as soon as each one is ready (None for deleted tasks)."""
+        if not task_gids:
+            return
+        if self.max_concurrency == 1 or len(task_gids) == 1:
+            for gid in task_gids:
+                yield self.fetch_task_details(gid)
+            return
+
+        workers = min(self.max_concurrency, len(task_gids))
+        fetch = bind_request(self.fetch_task_details)
+        gids = iter(task_gids)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # At most two fetches per worker are queued ahead of the consumer: enough to keep
+            # every worker busy behind a slow one, few enough that a consumer stopping early
+            # (a closed stream, a cancelled or over-budget prefetch) leaves few calls behind
+            pending = deque(executor.submit(fetch, gid) for gid in itertools.islice(gids, 2 * workers))
+            try:
+                while pending:
+                    task = pending.popleft().result()
+                    for gid in itertools.islice(gids, 1):
+                        pending.append(executor.submit(fetch, gid))
+                    yield task
+            finally:
+                for future in pending:
+                    future.cancel()
 
-        return tasks
+    # -------------------
+    # Incremental sync
+    # -------------------
+    def sync_tasks(self, project_gid: str, bulk: Optional[bool] = None) -> List[dict]:
+        """Bring the local snapshot of a project up to date and return its tasks.
+
+        The first load (or one after the sync token expired) takes a sync token
+        from the events endpoint and then does a full fetch. Later loads read
+        the events since that token and re-fetch only the tasks they mention.
+        """
+        key = self.cache_key("snapshot", project_gid)
+        with project_snapshots.lock_for(key):
+            snapshot = project_snapshots.get(key)
+            sync_token = None
+            if snapshot is not None and not snapshot.is_stale():
+                try:
+                    events, sync_token = self.read_events(project_gid, snapshot.sync_token)
+                except SyncTokenExpired as e:
+                    # The 412 already carries a fresh token for the resync
+                    sync_token = e.new_token
+                else:
+                    self.apply_events(project_gid, snapshot, events)
+                    snapshot.sync_token = sync_token
+                    return snapshot.as_list()
+
+            # Take the token before fetching, so changes made during the fetch are replayed next time
+            if not sync_token:
+                sync_token = self.fetch_sync_token(project_gid)
+            snapshot = ProjectSnapshot(sync_token, self.fetch_tasks(project_gid, bulk))
+            project_snapshots.set(key, snapshot)
+            return snapshot.as_list()
+
+    def fetch_sync_token(self, project_gid: str) -> Optional[str]:
+        """Get a fresh events sync token; Asana hands it out with a 412 response."""
+        try:
+            _, sync_token = self.read_events(project_gid, None)
+        except SyncTokenExpired as e:
+            return e.new_token
+        return sync_token
 
-    def get_task_details(self, task_gid: str):
-        """Fetch details for a specific task by gid."""
+    def try_fetch_sync_token(self, project_gid: str) -> Optional[str]:
+        try:
+            return self.fetch_sync_token(project_gid)
+        except Exception as e:
+            logger.warning("Could not get events sync token for project %s: %s", project_gid, e)
+            return None
+
+    def read_events(self, project_gid: str, sync_token: Optional[str]):
+        """Read every event since sync_token; returns (events, next_sync_token)."""
+        url = f"{BASE_URL}/events"
+        events = []
+        while True:
+            params = {"resource": project_gid}
+            if sync_token:
+                params["sync"] = sync_token
+            response = self.session.get(url, params=params)
+            res = response.json()
+            if response.status_code == 412:
+                raise SyncTokenExpired(res.get("sync"))
+            response.raise_for_status()
+
+            events.extend(res.get("data", []))
+            sync_token = res.get("sync", sync_token)
+            if not res.get("has_more"):
+                return events, sync_token
+
+    def apply_events(self, project_gid: str, snapshot: ProjectSnapshot, events: List[dict]):
+        """Re-fetch tasks touched by events and merge them into the snapshot.
+
+        Events do not say where an added or moved task now sits, so after any
+        event the project's gid order is re-read and the snapshot rebuilt in
+        it. Tasks listed there but missing locally are fetched as well.
+        """
+        if not events:
+            return
+        touched, removed = [], set()
+        for event in events:
+            resource = event.get("resource") or {}
+            if resource.get("resource_type") != "task":
+                continue
+            gid = resource.get("gid")
+            action = event.get("action")
+            parent = (event.get("parent") or {}).get("gid")
+
+            if action in TASK_REMOVED_ACTIONS and (action == "deleted" or parent == project_gid):
+                removed.add(gid)
+                touched = [g for g in touched if g != gid]
+            elif action in TASK_ADDED_ACTIONS and parent == project_gid:
+                removed.discard(gid)
+                touched.append(gid)
+            elif action == "changed" and gid in snapshot.tasks:
+                touched.append(gid)
+
+        order = self.fetch_task_order(project_gid)
+        touched = [g for g in dict.fromkeys(touched) if g not in removed]
+        known = set(touched)
+        touched += [g for g in order if g not in snapshot.tasks and g not in known]
+        changed = dict(zip(touched, self.iter_tasks_details(touched)))
+        # Deleted after the events were read; a full fetch would not list them either
+        removed.update(gid for gid, task in changed.items() if task is None)
+        changed = {gid: task for gid, task in changed.items() if task is not None}
+        snapshot.apply(changed, removed, order)
+
+    def fetch_task_order(self, project_gid: str) -> List[str]:
+        """The project's task gids in Asana's order, without task details."""
+        return [t["gid"] for t in self.iter_records(f"/projects/{project_gid}/tasks", {"opt_fields": "gid"})]
+
+    def fetch_task_details(self, task_gid: str) -> Optional[dict]:
+        """Fetch details for a specific task by gid; concurrent fetches of one task share a call.
+
+        Returns None if the task no longer exists. Other failures raise.
+        """
+        return inflight.do(self.cache_key("task", task_gid), lambda: self.request_task_details(task_gid))
+
+    def request_task_details(self, task_gid: str):
         url = f"{BASE_URL}/tasks/{task_gid}"
-        res = requests.get(url, headers=self.headers).json()
+        response = self.session.get(url)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        res = response.json()
         return self.format_task(res.get("data", {}),task_gid)
 
     def format_task(self, task: dict,task_gid: str) -> dict:
@@ -112,9 +573,249 @@ class AsanaClient_mod:
         }
 
         return filtered_task
-    
 
-app = FastAPI(title="Asana RAG Bot API", version="1.0.0")
+    # -------------------
+    # Notes ledger
+    # -------------------
+    def remember_notes(self, project_gid: str, tasks: List[dict], sync_token: Optional[str]):
+        """Keep the notes of freshly loaded tasks for the write path."""
+        if not sync_token:
+            # Without a token remote edits could not be detected, so always re-read
+            return
+        notes_ledger.set(self.cache_key("notes_sync", project_gid), sync_token)
+        for task in tasks:
+            notes_ledger.set(self.cache_key("notes", task["ID"]), (task["Notes"], project_gid))
+
+    def notes_sync_token(self, project_gid: str) -> Optional[str]:
+        """A sync token taken before any notes read from now on.
+
+        The project's token already in the ledger qualifies: an older token
+        only widens the conflict check. So the events round trip before a
+        load happens at most once per NOTES_LEDGER_TTL per project.
+        """
+        sync_token = notes_ledger.get(self.cache_key("notes_sync", project_gid))
+        return sync_token or self.try_fetch_sync_token(project_gid)
+
+    def known_notes(self, task_gids: List[str]) -> Dict[str, str]:
+        """Return notes from the last load that are still current, by task gid.
+
+        Conflict check: for each project involved, one events call lists the
+        tasks changed since that load. Those tasks (and any task whose
+        project events cannot be read) are left out, so the caller re-reads
+        their notes instead of overwriting a remote edit.
+        """
+        by_project = {}
+        for gid in task_gids:
+            entry = notes_ledger.get(self.cache_key("notes", gid))
+            if entry is not None:
+                notes, project_gid = entry
+                by_project.setdefault(project_gid, {})[gid] = notes
+
+        known = {}
+        for project_gid, notes in by_project.items():
+            token_key = self.cache_key("notes_sync", project_gid)
+            sync_token = notes_ledger.get(token_key)
+            if not sync_token:
+                continue
+            try:
+                events, sync_token = self.read_events(project_gid, sync_token)
+            except Exception:
+                # Expired or unreadable: the next load takes a fresh token
+                notes_ledger.invalidate(token_key)
+                continue
+
+            changed = {
+                (e.get("resource") or {}).get("gid")
+                for e in events
+                if (e.get("resource") or {}).get("resource_type") == "task"
+            }
+            for gid in changed:
+                if gid in notes:
+                    logger.info("Task %s changed remotely since it was loaded; re-reading notes", gid)
+                notes_ledger.invalidate(self.cache_key("notes", gid))
+            notes_ledger.set(token_key, sync_token)
+            known.update({gid: n for gid, n in notes.items() if gid not in changed})
+        return known
+
+    def read_notes(self, task_gid: str) -> str:
+        """Fetch only the current notes of a task.
+
+        Raises if they cannot be read: writing without them would replace
+        the task's notes with just the new text.
+        """
+        response = self.session.get(f"{BASE_URL}/tasks/{task_gid}", params={"opt_fields": "notes"})
+        response.raise_for_status()
+        return response.json()["data"].get("notes", "")
+
+    # -------------------
+    # Task updates
+    # -------------------
+    def update_task(self, task_gid: str, updates: dict, known: Optional[Dict[str, str]] = None) -> dict:
+        """Merge notes with the current ones and PUT the updates for one task.
+
+        Notes already known to be current (see known_notes) save the read
+        before the write; otherwise only the notes field is fetched.
+        """
+        url = f"{BASE_URL}/tasks/{task_gid}"
+
+        if known is None:
+            known = self.known_notes([task_gid])
+        old_notes = known.get(task_gid)
+        if old_notes is None:
+            old_notes = self.read_notes(task_gid)
+
+        updates = dict(updates)
+        updates["notes"] = merge_notes(old_notes, updates.get("notes"))
+
+        response = self.session.put(url, json={"data": updates})
+        if response.ok:
+            self.invalidate_task(task_gid)
+        return {
+            "task_id": task_gid,
+            "status": response.status_code,
+            "response": response.json() if response.ok else response.text
+        }
+
+    def try_update_task(self, task_gid: str, updates: dict, known: Optional[Dict[str, str]] = None) -> dict:
+        """Like update_task, but report a failure as the task's result instead of raising."""
+        try:
+            return self.update_task(task_gid, updates, known)
+        except requests.HTTPError as e:
+            # e.g. the notes read of a task that no longer exists
+            return {"task_id": task_gid, "status": e.response.status_code, "response": e.response.text}
+        except Exception as e:
+            return {"task_id": task_gid, "status": status.HTTP_502_BAD_GATEWAY, "response": str(e)}
+
+    def update_task_from_row(self, task: dict, known: Optional[Dict[str, str]] = None) -> dict:
+        """Push one formatted task row (as sent by the frontend) back to Asana."""
+        return self.try_update_task(task.get("ID"), row_updates(task), known)
+
+    def update_tasks_from_rows(self, tasks: List[dict]) -> List[dict]:
+        """Push many task rows back to Asana, keeping one result per row in input order.
+
+        Notes still current from the last load are reused; one events call per
+        project checks them for remote edits. Rows are split into chunks of
+        MAX_BATCH_ACTIONS that run in parallel. Each chunk costs one /batch
+        write, plus one /batch read if some notes are unknown. A chunk whose
+        batch calls fail is retried task by task, so one bad task or chunk
+        never aborts the rest. These calls run at bulk priority, behind page
+        loads on the same API key.
+        """
+        if not tasks:
+            return []
+        with priority(BULK):
+            try:
+                known = self.known_notes([task.get("ID") for task in tasks])
+            except Exception:
+                known = {}
+            chunk_size = MAX_BATCH_ACTIONS if self.batch_writes else 1
+            chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+            workers = min(self.max_concurrency, len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunk_results = executor.map(bind_request(lambda chunk: self.update_chunk(chunk, known)), chunks)
+                return [result for results in chunk_results for result in results]
+
+    def update_chunk(self, tasks: List[dict], known: Dict[str, str]) -> List[dict]:
+        if self.batch_writes:
+            try:
+                return self.batch_update(tasks, known)
+            except Exception:
+                logger.warning("Batch update of %d tasks failed; updating them one by one", len(tasks), exc_info=True)
+        return [self.update_task_from_row(task, known) for task in tasks]
+
+    def batch_update(self, tasks: List[dict], known: Dict[str, str]) -> List[dict]:
+        """Write merged updates for up to 10 tasks in one /batch call.
+
+        Notes not in known are read first with one more /batch call. Tasks
+        whose read fails inside the batch (the session only sees the outer
+        200, so it never retries them) go through update_task_from_row,
+        which retries the read and reports the task as failed rather than
+        write without its current notes.
+        """
+        unknown = [task.get("ID") for task in tasks if task.get("ID") not in known]
+        if unknown:
+            reads = self.run_batch([
+                {"method": "get", "relative_path": f"/tasks/{gid}", "options": {"fields": ["notes"]}}
+                for gid in unknown
+            ])
+            known = dict(known)
+            for gid, read in zip(unknown, reads):
+                if read.get("status_code") == 200:
+                    known[gid] = read["body"]["data"].get("notes", "")
+
+        batched = [i for i, task in enumerate(tasks) if task.get("ID") in known]
+        writes = []
+        for i in batched:
+            task = tasks[i]
+            updates = row_updates(task)
+            updates["notes"] = merge_notes(known[task.get("ID")], updates.get("notes"))
+            writes.append({"method": "put", "relative_path": f"/tasks/{task.get('ID')}", "data": updates})
+
+        results = [None] * len(tasks)
+        for i, write in zip(batched, self.run_batch(writes) if writes else []):
+            task_gid = tasks[i].get("ID")
+            code = write.get("status_code")
+            ok = code is not None and 200 <= code < 300
+            if ok:
+                self.invalidate_task(task_gid)
+            results[i] = {
+                "task_id": task_gid,
+                "status": code,
+                "response": write.get("body") if ok else json.dumps(write.get("body")),
+            }
+        for i, task in enumerate(tasks):
+            if results[i] is None:
+                results[i] = self.update_task_from_row(task, known)
+        return results
+
+    def run_batch(self, actions: List[dict]) -> List[dict]:
+        """POST actions to /batch and return one {status_code, body} per action."""
+        response = self.session.post(f"{BASE_URL}/batch", json={"data": {"actions": actions}})
+        response.raise_for_status()
+        results = response.json().get("data", [])
+        if len(results) != len(actions):
+            raise ValueError(f"/batch returned {len(results)} results for {len(actions)} actions")
+        return results
+
+
+def row_updates(task: dict) -> dict:
+    """Map a formatted task row to the Asana fields it updates."""
+    return {
+        "due_on": task.get("Due Date"),
+        "assignee": task.get("Assignee"),
+        "notes": task.get("Notes"),
+        "name": task.get("Name"),
+        # TODO: add priority/status via custom fields if needed
+    }
+
+
+def merge_notes(old_notes: str, new_notes: str) -> str:
+    if not old_notes or old_notes == "(empty)":
+        return new_notes
+    if not new_notes:
+        return old_notes
+    return f"{old_notes}\n---\nSpiked Insights:\n{new_notes}"
+
+
+# Bounded executor for blocking Asana I/O, so slow upstream calls never stall the event loop
+asana_executor = ThreadPoolExecutor(max_workers=ASANA_IO_WORKERS, thread_name_prefix="asana-io")
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking call on the Asana I/O executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(asana_executor, bind_request(functools.partial(fn, *args, **kwargs)))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    prefetcher.shutdown()
+    asana_executor.shutdown(wait=False, cancel_futures=True)
+    # Write any added tasks still queued before the process exits
+    await asyncio.to_thread(task_persistence.close, 10.0)
+
+
+app = FastAPI(title="Asana RAG Bot API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware to allow frontend access
 app.add_middleware(
@@ -124,9 +825,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-endpoint latency histograms and upstream call counts, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Asana clients per signed-in user, keyed by the session token handed out at login
+client_registry = ClientRegistry(AsanaClient_mod)
+
+# Warms workspaces, projects and recently opened projects into the cache after login
+prefetcher = Prefetcher()
 
-# Global variable to store the current client
-current_asana_client: Optional[AsanaClient_mod] = None
+SESSION_COOKIE = "asana_session"
+SESSION_HEADER = "X-Session-Token"
 
 # Pydantic models
 class AuthRequest(BaseModel):
@@ -159,52 +868,92 @@ class AddTasksRequest(BaseModel):
     workspace_gid: str
     project_gid: Optional[str] = None
 
-# Dependency to get the current Asana client
-async def get_asana_client():
-    if current_asana_client is None:
+def get_session_token(request: Request) -> Optional[str]:
+    return request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+
+# Dependency to get the Asana client of the calling user
+async def get_asana_client(request: Request):
+    client = client_registry.get(get_session_token(request))
+    if client is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated. Please authenticate with Asana API key first."
         )
-    return current_asana_client
+    return client
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "Asana RAG Bot API is running"}
 
-api=''
+@app.get("/metrics")
+async def get_metrics():
+    """Request latencies and upstream counters per endpoint, plus pool and cache stats."""
+    sessions = {}
+    for client in client_registry.clients():
+        for name, count in client.session.stats.snapshot().items():
+            sessions[name] = sessions.get(name, 0) + count
+    return {
+        **metrics.snapshot(),
+        "clients": len(client_registry),
+        "sessions": sessions,
+        "caches": {
+            "responses": response_cache.stats(),
+            "validation": validation_cache.stats(),
+            "notes_ledger": notes_ledger.stats(),
+            "encoded_responses": encoded_responses.stats(),
+        },
+        "singleflight": inflight.stats(),
+        "rate_limiters": rate_limiters.stats(),
+        "prefetch": prefetcher.stats(),
+        "task_store": task_persistence.stats(),
+        "task_index": task_index.stats() if task_index is not None else {},
+    }
+
 # Authentication endpoint
 @app.post("/api/asana/auth")
-async def authenticate(auth_request: AuthRequest):
-    global current_asana_client
-    global api
+async def authenticate(auth_request: AuthRequest, response: Response):
     try:
         client = AsanaClient_mod(auth_request.api_key)
         
         # Validate the API key
-        if not client.validate_api_key():
+        if not await run_blocking(client.validate_api_key):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid API key"
             )
         
-        current_asana_client = client
-        api=auth_request.api_key
-        print(api)
-        return {"message": "Authentication successful", "status": "authenticated"}
+        token = client_registry.create(auth_request.api_key, client)
+        if PREFETCH_ENABLED:
+            prefetcher.schedule(client)
+        response.set_cookie(SESSION_COOKIE, token, httponly=True, samesite="lax")
+        return {"message": "Authentication successful", "status": "authenticated", "session_token": token}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Authentication failed: {str(e)}"
         )
 
+@app.post("/api/asana/logout")
+async def logout(request: Request, response: Response):
+    token = get_session_token(request)
+    if token:
+        client = client_registry.get(token)
+        if client is not None:
+            # Other sessions of the same key keep a job they started
+            prefetcher.cancel(client.cache_namespace, client)
+        client_registry.remove(token)
+    response.delete_cookie(SESSION_COOKIE)
+    return {"message": "Logged out", "status": "unauthenticated"}
+
 # Asana API endpoints
 @app.get("/api/asana/workspaces")
 async def get_workspaces(client: AsanaClient_mod = Depends(get_asana_client)):
     try:
-        workspaces = client.get_workspaces()
+        workspaces = await run_blocking(client.get_workspaces)
         # print({"blejjj",workspaces})
         return {"data": workspaces}
     
@@ -215,39 +964,94 @@ async def get_workspaces(client: AsanaClient_mod = Depends(get_asana_client)):
 @app.get("/api/asana/projects/{workspace_id}")
 async def get_projects(workspace_id: str, client: AsanaClient_mod = Depends(get_asana_client)):
     try:
-        projects = client.get_projects(workspace_id)
-        print(projects)
+        projects = await run_blocking(client.get_projects, workspace_id)
+        logger.info("Loaded %d projects for workspace %s", len(projects), workspace_id)
         return {"data": projects}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/asana/tasks/{project_id}")
-async def get_tasks(project_id: str, client: AsanaClient_mod = Depends(get_asana_client)):
+# Streaming formats for the tasks endpoint: media type and record framing
+TASK_STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+def stream_tasks(client: AsanaClient_mod, project_id: str, fmt: str):
+    """Yield formatted tasks as NDJSON lines or SSE events while they are fetched.
+
+    The status code is already sent when an upstream error happens, so errors
+    are reported in-band: an {"error": ...} line for NDJSON, an "error" event
+    for SSE. SSE streams finish with an "end" event.
+    """
     try:
-        tasks = client.get_tasks(project_id)
-        print("Tasks:")
-        for t in tasks:
-            print(t)   # now prints clean filtered tasks
-            print("\n\n")
+        for task in client.iter_tasks(project_id, remember_notes=False):
+            if fmt == "sse":
+                yield b"data: " + dumps(task) + b"\n\n"
+            else:
+                yield dumps(task) + b"\n"
+    except Exception as e:
+        if fmt == "sse":
+            yield b"event: error\ndata: " + dumps({"error": str(e)}) + b"\n\n"
+        else:
+            yield dumps({"error": str(e)}) + b"\n"
+        return
 
-        if not tasks:
-            print("⚠️ No tasks found in project.")
-        
-        return {"data": tasks}
+    if fmt == "sse":
+        yield b"event: end\ndata: {}\n\n"
+
+# Serialized (and compressed) task lists and insights, reused while their data is unchanged
+encoded_responses = EncodedResponseCache()
+
+@app.get("/api/asana/tasks/{project_id}")
+async def get_tasks(
+    request: Request,
+    project_id: str,
+    stream: Optional[str] = None,
+    client: AsanaClient_mod = Depends(get_asana_client),
+):
+    # Opened projects are the ones prefetched at this key's next login
+    prefetcher.recent.touch(client.cache_namespace, project_id)
+    if stream is not None:
+        if stream not in TASK_STREAM_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported stream format '{stream}'. Use one of: {', '.join(TASK_STREAM_FORMATS)}",
+            )
+        # Sync generator: Starlette iterates it in a worker thread
+        return StreamingResponse(
+            stream_tasks(client, project_id, stream),
+            media_type=TASK_STREAM_FORMATS[stream],
+        )
+
+    try:
+        tasks = await run_blocking(client.get_tasks_snapshot, project_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    # Same cached list as last time: reuse its body and ETag, or answer 304
+    key = ("tasks", client.cache_namespace, project_id)
+    entry = encoded_responses.get(key, tasks)
+    if entry is None:
+        if tasks:
+            logger.info("Loaded %d tasks for project %s", len(tasks), project_id)
+            log_sample(logger, "Sample tasks", tasks)
+        else:
+            logger.warning("No tasks found in project %s", project_id)
+        entry = await asyncio.to_thread(encoded_responses.put, key, tasks, {"data": tasks})
+    return await encoded_json_response(request, entry, encoded_responses)
+
 
 @app.post("/api/asana/add-tasks")
-async def add_tasks(request: Request):
-    global stored_tasks
+async def add_tasks(request: Request, client: AsanaClient_mod = Depends(get_asana_client)):
     data = await request.json()
-    
-    print("Received tasks from frontend:")
-    for task in data:
-        print(task)  # each task is a dict (Name, Assignee, Priority, etc.)
-    
-    stored_tasks = data  # save them in memory
+    logger.info("Received %d tasks from frontend", len(data))
+    log_sample(logger, "Sample received tasks", data)
+
+    # Saved in memory at once, written to the persistent store in the background. Parsing
+    # and re-indexing a large list is CPU-bound, so it runs off the event loop.
+    await asyncio.to_thread(
+        task_persistence.save, client.cache_namespace, [TaskRecord.from_row(task) for task in data]
+    )
     return {"status": "ok", "count": len(data)}
 
 
@@ -345,117 +1149,133 @@ async def add_tasks(request: Request):
 
 #     return None
 
-from datetime import datetime, timedelta
-import random
-
-stored_tasks = []  # global storage for tasks
+# Added tasks per API key namespace, indexed for server-side queries; persisted (SQLite by
+# default) and reloaded when another worker saved newer ones
+task_persistence = PersistentTaskStore(create_task_backend())
+
+@app.get("/api/asana/stored-tasks")
+async def query_stored_tasks(
+    assignee: Optional[str] = None,
+    status_: Optional[str] = Query(None, alias="status"),
+    priority: Optional[str] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    client: AsanaClient_mod = Depends(get_asana_client),
+):
+    """Filter, sort and page the signed-in user's added tasks on the server.
+
+    Filters take the values shown in the table ("Unassigned", "Not set"
+    match tasks without a value); due_from/due_to are inclusive YYYY-MM-DD.
+    """
+    if sort is not None and sort not in SORTABLE_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort by '{sort}'. Use one of: {', '.join(SORTABLE_COLUMNS)}",
+        )
+    dates = {}
+    for name, value in (("due_from", due_from), ("due_to", due_to)):
+        if value is not None:
+            dates[name] = parse_due_date(value)
+            if dates[name] is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {name}: '{value}'")
+
+    def placeholder_to_none(value, placeholder):
+        if value is None:
+            return ...
+        return None if value == placeholder else value
+
+    await asyncio.to_thread(task_persistence.sync, client.cache_namespace)
+    total, records = task_persistence.store(client.cache_namespace).query(
+        assignee=placeholder_to_none(assignee, UNASSIGNED),
+        status=placeholder_to_none(status_, NOT_SET),
+        priority=placeholder_to_none(priority, NOT_SET),
+        due_from=dates.get("due_from"),
+        due_to=dates.get("due_to"),
+        sort_by=sort,
+        descending=order == "desc",
+        offset=offset,
+        limit=limit,
+    )
+    return {"tasks": [r.to_row() for r in records], "total": total, "offset": offset, "limit": limit}
 
 @app.get("/api/asana/spiked-insights")
-async def spiked_insights():
-    global stored_tasks
-    if not stored_tasks:
-        return {"tasks": []}  # nothing added yet
-
-    updated_tasks = []
-    for task in stored_tasks:
-        # Copy so we don't mutate the original task
-        t = task.copy()
-
-        # Apply some arbitrary "insight" changes
-
-        # Example: push due date by random days
-        try:
-            if t.get("Due Date") and t["Due Date"] != "No due date":
-                due_date = datetime.strptime(t["Due Date"], "%Y-%m-%d")
-                new_due_date = due_date + timedelta(days=random.randint(1, 5))
-                t["Due Date"] = new_due_date.strftime("%Y-%m-%d")
-        except Exception:
-            pass
-
-        # Flip priority randomly
-        priorities = ["Low", "Medium", "High"]
-        t["Priority"] = random.choice(priorities)
-
-        # Change status randomly
-        statuses = ["Off track", "At risk", "On track"]
-        t["Status"] = random.choice(statuses)
-
-        # Add some placeholder notes
-        t["Notes"] = f"Suggested update for {t['Name']}"
-
-        updated_tasks.append(t)
-
-    return {"tasks": updated_tasks}
+async def spiked_insights(
+    request: Request,
+    seed: Optional[int] = None,
+    client: AsanaClient_mod = Depends(get_asana_client),
+):
+    namespace = client.cache_namespace
+
+    # CPU-bound batch over the signed-in user's added tasks; keep it off the event loop
+    def run() -> EncodedBody:
+        task_persistence.sync(namespace)
+        task_store = task_persistence.store(namespace)
+        if seed is None:
+            # Unseeded results differ on every call; nothing worth caching
+            return EncodedBody(None, dumps({"tasks": compute_spiked_insights(task_store, seed)}))
+        # replace() swaps in new columns, so they identify the store contents
+        columns = task_store.columns
+        key = ("spiked-insights", namespace, seed)
+        entry = encoded_responses.get(key, columns)
+        if entry is None:
+            entry = encoded_responses.put(key, columns, {"tasks": compute_spiked_insights(task_store, seed)})
+        return entry
+
+    return await encoded_json_response(request, await asyncio.to_thread(run), encoded_responses)
+
+# Embedded task chunks for semantic search, persisted next to the app (ASANA_VECTOR_INDEX).
+# Built on first use: core.retrieval needs numpy and core.config, which the rest of the API does not
+task_index = None
+task_index_lock = threading.Lock()
+
+def get_task_index():
+    global task_index
+    with task_index_lock:
+        if task_index is None:
+            from core.retrieval import TaskVectorIndex
+
+            task_index = TaskVectorIndex()
+        return task_index
+
+@app.post("/api/asana/index/{project_id}")
+async def index_project_tasks(project_id: str, client: AsanaClient_mod = Depends(get_asana_client)):
+    """Embed a project's tasks for search; only tasks whose name or notes changed are re-embedded."""
+    try:
+        # A sync, not a page load: let interactive calls on this key go first
+        tasks = await run_blocking(at_priority(BULK, client.get_tasks), project_id, remember_notes=False)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    # Embedding is CPU-bound; keep it off the Asana I/O pool
+    index = await asyncio.to_thread(get_task_index)
+    result = await asyncio.to_thread(index.index_project, client.cache_namespace, project_id, tasks)
+    return {"project": project_id, "tasks": len(tasks), **result}
+
+@app.get("/api/asana/search")
+async def search_tasks(
+    q: str = Query(..., min_length=1),
+    top_k: Optional[int] = Query(None, ge=1, le=50, description="Defaults to TOP_K from core/config.py"),
+    project_id: Optional[str] = None,
+    client: AsanaClient_mod = Depends(get_asana_client),
+):
+    """Top-K indexed tasks of the signed-in user most similar to q, best first."""
+    index = await asyncio.to_thread(get_task_index)
+    hits = await asyncio.to_thread(index.search, client.cache_namespace, q, top_k, project_id)
+    return {"data": hits}
 
 @app.post("/api/asana/update-tasks")
-async def update_tasks_to_asana(request: Request):   # to the main asana dashboard
-    global api
+async def update_tasks_to_asana(request: Request, client: AsanaClient_mod = Depends(get_asana_client)):   # to the main asana dashboard
     data = await request.json()
 
-    def merge_notes(old_notes: str, new_notes: str) -> str:
-        if not old_notes or old_notes == "(empty)":
-            return new_notes
-        if not new_notes:
-            return old_notes
-        return f"{old_notes}\n---\nSpiked Insights:\n{new_notes}"
-
     # If it's a list, loop over each
     if isinstance(data, list):
-        results = []
-        for task in data:
-            task_id = task.get("ID")
-
-            # Fetch existing task first to preserve current notes
-            url_get = f"{BASE_URL}/tasks/{task_id}"
-            headers = {
-                "Authorization": f"Bearer {api}",
-                "Content-Type": "application/json",
-            }
-            existing_resp = requests.get(url_get, headers=headers)
-            old_notes = ""
-            if existing_resp.ok:
-                old_notes = existing_resp.json()["data"].get("notes", "")
-
-            # Merge notes
-            merged_notes = merge_notes(old_notes, task.get("Notes"))
-
-            updates = {
-                "due_on": task.get("Due Date"),
-                "assignee": task.get("Assignee"),
-                "notes": merged_notes,
-                "name": task.get("Name"),
-                # TODO: add priority/status via custom fields if needed
-            }
-
-            # Update task
-            response = requests.put(url_get, json={"data": updates}, headers=headers)
-
-            results.append({
-                "task_id": task_id,
-                "status": response.status_code,
-                "response": response.json() if response.ok else response.text
-            })
-
+        results = await run_blocking(client.update_tasks_from_rows, data)
         return {"results": results}
 
     # Single task update
-    task_id = data.get("ID")
-    updates = data.get("updates", {})
+    result = await run_blocking(client.try_update_task, data.get("ID"), data.get("updates", {}))
+    return result["response"]
 
-    url_get = f"{BASE_URL}/tasks/{task_id}"
-    headers = {
-        "Authorization": f"Bearer {api}",
-        "Content-Type": "application/json",
-    }
-    existing_resp = requests.get(url_get, headers=headers)
-    old_notes = ""
-    if existing_resp.ok:
-        old_notes = existing_resp.json()["data"].get("notes", "")
-
-    # Merge notes
-    new_notes = updates.get("notes")
-    updates["notes"] = merge_notes(old_notes, new_notes)
-
-    # Update task
-    response = requests.put(url_get, json={"data": updates}, headers=headers)
-    return response.json()
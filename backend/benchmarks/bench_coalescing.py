@@ -0,0 +1,58 @@
+"""Upstream calls when many clients open the same project at once.
+
+Fires --concurrency identical /api/asana/tasks/{project_id} requests
+together with a cold cache and reports how many reached the fake Asana
+server, in bulk and per-task detail mode. Run from the backend directory:
+
+    python -m benchmarks.bench_coalescing --tasks 300 --concurrency 10
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+
+
+async def run(task_count: int, concurrency: int, latency: float):
+    state = FakeAsanaState(task_count=task_count, latency=latency)
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    transport = httpx.ASGITransport(app=app.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            for label, bulk in (("bulk", True), ("per-task details", False)):
+                # Separate sessions of the same API key, like several users or tabs
+                tokens = [
+                    app.client_registry.create("fake-key", app.AsanaClient_mod("fake-key", bulk_projection=bulk))
+                    for _ in range(concurrency)
+                ]
+                app.response_cache.clear()
+                state.reset_counts()
+                before = app.inflight.stats()["shared"]
+                started = time.perf_counter()
+                responses = await asyncio.gather(*[
+                    client.get("/api/asana/tasks/1", headers={app.SESSION_HEADER: token}) for token in tokens
+                ])
+                elapsed = time.perf_counter() - started
+                assert all(r.status_code == 200 and len(r.json()["data"]) == task_count for r in responses)
+                # List pages, plus the events token, plus one detail call per task without bulk
+                single = -(-task_count // app.MAX_PAGE_SIZE) + 1 + (0 if bulk else task_count)
+                print(
+                    f"{label:>16}: {concurrency} requests -> {state.calls['total']} upstream calls "
+                    f"(~{single * concurrency} uncoalesced), {app.inflight.stats()['shared'] - before} joined "
+                    f"an in-flight fetch, {elapsed:.2f}s"
+                )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake upstream latency per call, seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.concurrency, args.latency))
@@ -0,0 +1,68 @@
+"""Check that /health stays responsive while a large task fetch is running.
+
+Drives the ASGI app in-process (httpx.ASGITransport), so anything that blocks
+the event loop shows up directly as /health latency. Run from the backend
+directory:
+
+    python -m benchmarks.bench_health_latency --tasks 400 --latency 0.02
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def run(task_count: int, latency: float):
+    state = FakeAsanaState(task_count=task_count, latency=latency)
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    token = app.client_registry.create("fake-key", app.AsanaClient_mod("fake-key", bulk_projection=False))
+
+    transport = httpx.ASGITransport(app=app.app)
+    headers = {app.SESSION_HEADER: token}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers) as client:
+            idle = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(probe_health(client, stop, idle))
+            await asyncio.sleep(0.5)
+            stop.set()
+            await probe
+
+            busy = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(probe_health(client, stop, busy))
+            started = time.perf_counter()
+            response = await client.get("/api/asana/tasks/1", timeout=None)
+            fetch_time = time.perf_counter() - started
+            stop.set()
+            await probe
+    finally:
+        server.shutdown()
+
+    print(f"task fetch: {len(response.json()['data'])} tasks in {fetch_time:.2f}s")
+    for label, samples in (("idle", idle), ("during fetch", busy)):
+        samples = sorted(samples)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(f"/health {label:>12}: n={len(samples)} p50={statistics.median(samples) * 1000:.1f}ms p99={p99 * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake upstream latency per call, seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.latency))
@@ -0,0 +1,76 @@
+"""Import-time regression guard for core/config.py.
+
+Runs ``python -X importtime -c "import core.config"`` in a fresh interpreter,
+reports the cumulative import time and the slowest imports, and fails if a
+heavy dependency is imported eagerly or the total exceeds --max-ms.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_import_time --module core.config --max-ms 150
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Loaded by services in core/config.py on first use only, never at import time
+HEAVY_MODULES = ("torch", "transformers", "tiktoken", "pytesseract", "supabase", "google.cloud.storage")
+
+
+def import_times(module: str):
+    """Return {imported module: cumulative microseconds} for importing module.
+
+    An empty module name times interpreter startup alone.
+    """
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def run(module: str, max_ms: float, top: int, repeat: int) -> int:
+    # Best of several runs, since the first one also pays for cold disk caches
+    runs = [import_times(module) for _ in range(repeat)]
+    times = min(runs, key=lambda t: t.get(module, 0))
+    total_ms = times.get(module, 0) / 1000
+    startup = import_times("")
+
+    print(f"import {module}: {total_ms:.1f}ms cumulative (best of {repeat})")
+    print(f"slowest {top} imports:")
+    imported = {name: us for name, us in times.items() if name not in startup}
+    for name, us in sorted(imported.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
+    failures = []
+    eager = [m for m in HEAVY_MODULES if m in times]
+    if eager:
+        failures.append(f"heavy modules imported eagerly: {', '.join(eager)}")
+    if max_ms and total_ms > max_ms:
+        failures.append(f"{total_ms:.1f}ms exceeds the {max_ms:.0f}ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="core.config")
+    parser.add_argument("--max-ms", type=float, default=150.0)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sys.exit(run(args.module, args.max_ms, args.top, args.repeat))
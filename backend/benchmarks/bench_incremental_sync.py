@@ -0,0 +1,63 @@
+"""Compare a full project reload with an incremental (events-based) one.
+
+Loads a project, applies a few remote edits, a move, additions (at the end
+and mid-project) and a removal to the fake Asana server, then reloads it both ways. Checks that the incremental
+result is identical to a full fetch and reports upstream calls for each.
+Also checks the fallback to a full resync when the sync token expires.
+Run from the backend directory:
+
+    python -m benchmarks.bench_incremental_sync --tasks 800 --changes 2
+"""
+import argparse
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+
+
+def reload(client, state, incremental: bool):
+    app.response_cache.clear()
+    state.reset_counts()
+    tasks = client.get_tasks("1", incremental=incremental)
+    return tasks, state.calls["total"]
+
+
+def run(task_count: int, changes: int):
+    state = FakeAsanaState(task_count=task_count)
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    client = app.AsanaClient_mod("fake-key")
+
+    try:
+        _, calls = reload(client, state, incremental=True)
+        print(f"initial load:       {calls} HTTP calls")
+
+        gids = [t["gid"] for t in state.tasks["1"]]
+        for i in range(changes):
+            state.change_task(gids[i * 3], notes=f"edited {i}")
+        state.add_task("1", task_count)
+        state.add_task("1", task_count + 1, position=task_count // 2)
+        state.move_task("1", gids[2], 0)
+        state.remove_task("1", gids[-1])
+
+        incremental, inc_calls = reload(client, state, incremental=True)
+        full, full_calls = reload(client, state, incremental=False)
+        assert incremental == full, "incremental sync diverged from a full fetch"
+        print(f"full reload:        {full_calls} HTTP calls")
+        print(f"incremental reload: {inc_calls} HTTP calls ({changes} changed, 1 moved, 2 added, 1 removed)")
+
+        state.change_task(gids[1], name="renamed")
+        state.expire_sync_tokens()
+        resynced, calls = reload(client, state, incremental=True)
+        full, _ = reload(client, state, incremental=False)
+        assert resynced == full, "resync after token expiry diverged from a full fetch"
+        print(f"expired-token resync: {calls} HTTP calls")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=800)
+    parser.add_argument("--changes", type=int, default=2)
+    args = parser.parse_args()
+    run(args.tasks, args.changes)
@@ -0,0 +1,61 @@
+"""First project click after login, cold vs warmed by the background prefetch.
+
+Opens a project once (so it counts as recently used), logs in again, and
+times workspaces -> projects -> tasks the way the frontend calls them.
+Run from the backend directory:
+
+    python -m benchmarks.bench_prefetch --tasks 500 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    response = await client.post("/api/asana/auth", json={"api_key": "fake-key"})
+    return {app.SESSION_HEADER: response.json()["session_token"]}
+
+
+async def first_click(client: httpx.AsyncClient, headers: dict, state: FakeAsanaState):
+    state.reset_counts()
+    started = time.perf_counter()
+    workspaces = (await client.get("/api/asana/workspaces", headers=headers)).json()["data"]
+    await client.get(f"/api/asana/projects/{workspaces[0]['workspace_id']}", headers=headers)
+    tasks = (await client.get("/api/asana/tasks/1", headers=headers)).json()["data"]
+    return time.perf_counter() - started, state.calls["total"], len(tasks)
+
+
+async def run(task_count: int, latency: float, think_time: float):
+    state = FakeAsanaState(task_count=task_count, latency=latency)
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    transport = httpx.ASGITransport(app=app.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            for label, prefetch in (("cold", False), ("prefetched", True)):
+                app.response_cache.clear()
+                app.validation_cache.clear()
+                app.prefetcher.recent.touch(app.key_namespace("fake-key"), "1")
+                app.PREFETCH_ENABLED = prefetch
+                headers = await login(client)
+                # The user reading the workspace list before clicking
+                await asyncio.sleep(think_time)
+                elapsed, calls, count = await first_click(client, headers, state)
+                print(f"{label:>10}: {count} tasks, first click {elapsed * 1000:.0f}ms, {calls} upstream calls on the click")
+            print(f"prefetch stats: {app.prefetcher.stats()}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake upstream latency per call, seconds")
+    parser.add_argument("--think-time", type=float, default=1.0, help="seconds between login and first click")
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.latency, args.think_time))
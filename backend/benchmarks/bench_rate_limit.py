@@ -0,0 +1,89 @@
+"""Client-side token bucket: 429s avoided, and page loads during a bulk write.
+
+1. Loads a project task by task against a fake Asana that allows
+   --server-rate calls per second, without and with a matching bucket,
+   and counts the 429s it returned.
+2. Runs a bulk update while timing interactive single-task reads on the
+   same key, with the reads at interactive and at bulk priority.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_rate_limit --tasks 200 --server-rate 50
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+from core.ratelimit import BULK, INTERACTIVE, TokenBucket, priority
+
+UNLIMITED = 1e9
+
+
+def make_client(per_minute: float, burst: int = 10, **kwargs):
+    return app.AsanaClient_mod(
+        "fake-key",
+        bulk_projection=False,
+        rate_limiter=TokenBucket(per_minute, burst),
+        **kwargs,
+    )
+
+
+def load_project(state, per_minute: float, label: str):
+    app.response_cache.clear()
+    state.reset_counts()
+    client = make_client(per_minute, max_concurrency=16)
+    started = time.perf_counter()
+    tasks = client.get_tasks("1")
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:>22}: {len(tasks)} tasks in {elapsed:.2f}s, {state.calls['total']} upstream calls, "
+        f"{state.calls['rate_limited']} answered 429"
+    )
+
+
+def reads_during_bulk_write(state, task_count: int, per_minute: float, read_level: int):
+    client = make_client(per_minute, max_concurrency=8, batch_writes=False)
+    rows = [client.fetch_task_details(f"1{i:06d}") for i in range(task_count)]
+    for row in rows:
+        row["Notes"] = "Bulk rewrite"
+
+    writer = threading.Thread(target=client.update_tasks_from_rows, args=(rows,))
+    writer.start()
+    time.sleep(0.2)  # let the bulk write queue up behind the bucket
+    latencies = []
+    with priority(read_level):
+        for i in range(10):
+            started = time.perf_counter()
+            client.fetch_task_details(f"1{i:06d}")
+            latencies.append((time.perf_counter() - started) * 1000)
+    writer.join()
+    return statistics.median(latencies), max(latencies)
+
+
+def run(task_count: int, server_rate: int):
+    state = FakeAsanaState(task_count=task_count, rate_limit=server_rate)
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    try:
+        load_project(state, UNLIMITED, "no client limit")
+        time.sleep(1.0)  # let the server's window reset
+        load_project(state, server_rate * 60 * 0.9, "bucket at 90% of limit")
+
+        state.rate_limit = 0
+        per_minute = server_rate * 60
+        for label, level in (("interactive", INTERACTIVE), ("bulk (no priority)", BULK)):
+            p50, worst = reads_during_bulk_write(state, task_count, per_minute, level)
+            print(f"reads during bulk write, {label:>18}: p50 {p50:.0f}ms, max {worst:.0f}ms")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--server-rate", type=int, default=50, help="calls per second the fake Asana allows")
+    args = parser.parse_args()
+    run(args.tasks, args.server_rate)
@@ -0,0 +1,105 @@
+"""Payload size and serialization time for large task responses.
+
+Compares FastAPI's default JSON path (jsonable_encoder + json.dumps) with
+core.responses.dumps, reports the body size raw, gzipped and (when brotli is
+installed) brotli-compressed, then times repeat polls of
+/api/asana/tasks/{project_id} through the ASGI app against the local fake
+Asana server: a full 200 and a 304 for a matching If-None-Match.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_responses --tasks 5000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, make_task, start_fake_asana
+from core import responses
+
+
+def timed(fn, repeat: int) -> float:
+    """Median seconds per call over repeat calls."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def serialization(task_count: int, repeat: int):
+    client = app.AsanaClient_mod("fake-key")
+    payload = {"data": [client.format_task(make_task(i, "1"), str(i)) for i in range(task_count)]}
+
+    baseline = timed(lambda: JSONResponse(jsonable_encoder(payload)).body, repeat)
+    fast = timed(lambda: responses.dumps(payload), repeat)
+    body = responses.dumps(payload)
+    encoder = "orjson" if responses.orjson is not None else "json"
+
+    print(f"tasks: {task_count}")
+    print(f"serialize, FastAPI default: {baseline * 1000:8.1f}ms")
+    print(f"serialize, {encoder:<14}  {fast * 1000:8.1f}ms  ({baseline / fast:.1f}x)")
+    print(f"body, raw:    {len(body) / 1024:8.1f} KiB")
+    gzip_time = timed(lambda: responses.compress(body, "gzip"), repeat)
+    gzipped = responses.compress(body, "gzip")
+    print(f"body, gzip:   {len(gzipped) / 1024:8.1f} KiB  ({len(gzipped) / len(body):.0%}, {gzip_time * 1000:.1f}ms)")
+    if responses.brotli is not None:
+        br_time = timed(lambda: responses.compress(body, "br"), repeat)
+        compressed = responses.compress(body, "br")
+        print(f"body, brotli: {len(compressed) / 1024:8.1f} KiB  ({len(compressed) / len(body):.0%}, {br_time * 1000:.1f}ms)")
+    else:
+        print("body, brotli: not installed")
+
+
+async def polling(task_count: int, polls: int):
+    state = FakeAsanaState(task_count=task_count)
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    token = app.client_registry.create("fake-key", app.AsanaClient_mod("fake-key"))
+    transport = httpx.ASGITransport(app=app.app)
+    headers = {app.SESSION_HEADER: token, "Accept-Encoding": "gzip, br"}
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+            first = await client.get("/api/asana/tasks/1")
+            first.raise_for_status()
+            etag = first.headers["etag"]
+
+            async def poll(extra: dict):
+                samples, downloaded = [], 0
+                for _ in range(polls):
+                    started = time.perf_counter()
+                    response = await client.get("/api/asana/tasks/1", headers=extra)
+                    samples.append(time.perf_counter() - started)
+                    downloaded = response.num_bytes_downloaded
+                return statistics.median(samples), response.status_code, downloaded
+
+            for label, extra in (
+                ("repeat poll", {}),
+                ("If-None-Match", {"If-None-Match": etag}),
+            ):
+                seconds, code, size = await poll(extra)
+                print(f"{label:<14} {code}  {seconds * 1000:7.2f}ms  {size / 1024:8.1f} KiB on the wire")
+    finally:
+        server.shutdown()
+    print(f"encoded response cache: {app.encoded_responses.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per serializer")
+    parser.add_argument("--polls", type=int, default=20, help="timed polls per scenario")
+    args = parser.parse_args()
+    serialization(args.tasks, args.repeat)
+    asyncio.run(polling(args.tasks, args.polls))
+
+
+if __name__ == "__main__":
+    main()
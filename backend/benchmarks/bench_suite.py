@@ -0,0 +1,206 @@
+"""End-to-end benchmark suite against the local fake Asana server.
+
+Times /api/asana/tasks/{project_id}, /api/asana/update-tasks and
+/api/asana/spiked-insights through the ASGI app and reports p50/p99
+latency, upstream calls per request and peak RSS as JSON. Each scenario
+runs in its own process so peak RSS is per scenario. No network access
+is needed.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_suite --tasks 500 --latency-ms 5 --output results.json
+    python -m benchmarks.bench_suite --baseline results.json   # exit 1 on regression
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = ("tasks", "update_tasks", "spiked_insights")
+# Metrics compared against a baseline; higher is worse for all of them
+COMPARED = ("p50_ms", "p99_ms", "upstream_calls_per_request", "peak_rss_mb")
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_scenario(name: str, args) -> dict:
+    import httpx
+
+    import app
+    from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+
+    state = FakeAsanaState(
+        task_count=args.tasks,
+        latency=args.latency_ms / 1000,
+        max_page_size=args.page_size,
+        rate_limit=args.rate_limit,
+    )
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    token = app.client_registry.create("bench-key", app.AsanaClient_mod("bench-key", page_size=args.page_size))
+
+    transport = httpx.ASGITransport(app=app.app)
+    headers = {app.SESSION_HEADER: token}
+    latencies = []
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+            if name == "tasks":
+
+                def prepare(_):
+                    # Every request goes upstream (incrementally with ASANA_INCREMENTAL_SYNC)
+                    app.response_cache.clear()
+
+                def call(_):
+                    return client.get("/api/asana/tasks/1")
+
+            elif name == "update_tasks":
+                rows = (await client.get("/api/asana/tasks/1")).json()["data"][: args.updates]
+
+                def prepare(i):
+                    for row in rows:
+                        row["Notes"] = f"Benchmark note {i}"
+
+                def call(_):
+                    return client.post("/api/asana/update-tasks", json=rows)
+
+            else:
+                rows = (await client.get("/api/asana/tasks/1")).json()["data"]
+                await client.post("/api/asana/add-tasks", json=rows)
+
+                def prepare(_):
+                    pass
+
+                def call(i):
+                    return client.get("/api/asana/spiked-insights", params={"seed": i})
+
+            for i in range(args.warmup):
+                prepare(i)
+                (await call(i)).raise_for_status()
+            state.reset_counts()
+
+            for i in range(args.iterations):
+                prepare(i)
+                started = time.perf_counter()
+                response = await call(i)
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+    finally:
+        server.shutdown()
+
+    calls = dict(state.calls)
+    return {
+        "iterations": args.iterations,
+        "p50_ms": round(percentile(latencies, 0.5), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "upstream_calls_per_request": round(calls.get("total", 0) / args.iterations, 2),
+        "upstream_rate_limited": calls.get("rate_limited", 0),
+        "upstream_calls": {k: v for k, v in sorted(calls.items()) if k not in ("total", "rate_limited")},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_child(name: str, args) -> dict:
+    """Run one scenario in a fresh interpreter and return its result."""
+    command = [
+        sys.executable, "-m", "benchmarks.bench_suite", "--scenario", name, "--child",
+        "--tasks", str(args.tasks), "--latency-ms", str(args.latency_ms), "--page-size", str(args.page_size),
+        "--rate-limit", str(args.rate_limit), "--iterations", str(args.iterations),
+        "--warmup", str(args.warmup), "--updates", str(args.updates),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the app's local stores out of the working directory
+        env = {
+            **os.environ,
+            "ASANA_TASK_STORE": f"sqlite:///{os.path.join(tmp, 'tasks.db')}",
+            "ASANA_VECTOR_INDEX": os.path.join(tmp, "vectors.db"),
+            "ASANA_LOG_LEVEL": "WARNING",
+        }
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(command, cwd=backend_dir, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"scenario {name} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of more than tolerance (a fraction) against baseline results."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for metric in COMPARED:
+            old, new = before.get(metric), result.get(metric)
+            # Small absolute values are noisy; ignore changes under 1 unit
+            if old is not None and new is not None and new > old * (1 + tolerance) and new - old >= 1:
+                regressions.append(f"{name}.{metric}: {old} -> {new}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="default: all")
+    parser.add_argument("--tasks", type=int, default=500, help="tasks in the fake project")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake upstream latency per call")
+    parser.add_argument("--page-size", type=int, default=100, help="page size requested and served")
+    parser.add_argument("--rate-limit", type=int, default=0, help="fake upstream calls per second, 0 = unlimited")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--updates", type=int, default=50, help="tasks sent per update-tasks call")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--baseline", help="JSON from an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    scenarios = args.scenario or list(SCENARIOS)
+    if args.child:
+        print(json.dumps(asyncio.run(run_scenario(scenarios[0], args))))
+        return 0
+
+    report = {
+        "config": {
+            "tasks": args.tasks,
+            "latency_ms": args.latency_ms,
+            "page_size": args.page_size,
+            "rate_limit": args.rate_limit,
+            "iterations": args.iterations,
+            "updates": args.updates,
+            "python": platform.python_version(),
+        },
+        "results": {name: run_child(name, args) for name in scenarios},
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report["results"], json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
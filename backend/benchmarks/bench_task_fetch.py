@@ -0,0 +1,39 @@
+"""Compare upstream HTTP calls for the per-task and bulk projection fetch modes.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_task_fetch --tasks 800
+"""
+import argparse
+import time
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+
+
+def run(task_count: int):
+    state = FakeAsanaState(task_count=task_count)
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    client = app.AsanaClient_mod("fake-key")
+
+    results = {}
+    try:
+        for mode, bulk in (("per_task", False), ("bulk", True)):
+            state.reset_counts()
+            app.response_cache.clear()
+            started = time.perf_counter()
+            tasks = client.get_tasks("1", bulk=bulk)
+            elapsed = time.perf_counter() - started
+            results[mode] = tasks
+            print(f"{mode:>9}: {len(tasks)} tasks, {state.calls['total']} HTTP calls, {elapsed:.3f}s")
+    finally:
+        server.shutdown()
+
+    assert results["per_task"] == results["bulk"], "bulk mode changed format_task output"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=800)
+    run(parser.parse_args().tasks)
@@ -0,0 +1,100 @@
+"""Task vector index: full vs incremental indexing and top-K search latency.
+
+Uses the configured e5 model and tiktoken by default; --hashing-embedder
+swaps in a cheap bag-of-words embedder to time the index itself.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_task_index --tasks 2000 --changed 20
+"""
+import argparse
+import hashlib
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+import app
+from benchmarks.fake_asana import make_task
+from core.config import TOP_K
+from core.retrieval import TaskVectorIndex
+
+
+class CountingEmbedder:
+    """Wraps an embedder and counts the texts it is asked to embed."""
+
+    def __init__(self, embed):
+        self.embed = embed
+        self.texts = 0
+
+    def __call__(self, texts, kind="passage"):
+        self.texts += len(texts)
+        return self.embed(texts, kind)
+
+
+def hashing_embedder(texts, kind="passage", dim=256):
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % dim] += 1
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class WhitespaceTokenizer:
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run(task_count: int, changed: int, queries: int, hashing: bool):
+    client = app.AsanaClient_mod("fake-key")
+    tasks = [client.format_task(make_task(i, "1"), str(i)) for i in range(task_count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        embedder = CountingEmbedder(hashing_embedder if hashing else app.get_task_index().embedder)
+        index = TaskVectorIndex(
+            os.path.join(tmp, "vectors.db"),
+            embedder=embedder,
+            tokenizer=WhitespaceTokenizer() if hashing else None,
+        )
+
+        result, full = timed(lambda: index.index_project("ns", "1", tasks))
+        print(f"tasks: {task_count}")
+        print(f"full index:        {full:.3f}s  ({result['embedded_chunks']} chunks embedded)")
+
+        for task in tasks[:changed]:
+            task["Notes"] = f"Rescheduled after review {task['ID']}"
+        before = embedder.texts
+        result, incremental = timed(lambda: index.index_project("ns", "1", tasks))
+        print(
+            f"resync, {changed} changed: {incremental:.3f}s  "
+            f"({embedder.texts - before} chunks embedded, {result['unchanged_tasks']} unchanged)"
+        )
+
+        index.search("ns", "warm up")
+        latencies = [timed(lambda: index.search("ns", f"notes for task {i}"))[1] * 1000 for i in range(queries)]
+        print(
+            f"search top-{TOP_K}: p50 {statistics.median(latencies):.2f}ms, "
+            f"max {max(latencies):.2f}ms over {queries} queries"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--changed", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--hashing-embedder", action="store_true")
+    args = parser.parse_args()
+    run(args.tasks, args.changed, args.queries, args.hashing_embedder)
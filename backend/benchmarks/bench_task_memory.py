@@ -0,0 +1,59 @@
+"""Memory used by stored tasks: JSON-row dicts vs TaskRecord.
+
+Builds synthetic tasks the way add_tasks receives them (format_task rows
+decoded from a JSON request body) and measures each representation with
+tracemalloc. Run from the backend directory:
+
+    python -m benchmarks.bench_task_memory --tasks 100000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import app
+from benchmarks.fake_asana import make_task
+from core.tasks import TaskRecord
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def run(task_count: int):
+    client = app.AsanaClient_mod("fake-key")
+    rows = [client.format_task(make_task(i, "1"), f"1{i:06d}") for i in range(task_count)]
+    # Decode from JSON so no strings are shared with the generator, as in a real request
+    body = json.dumps(rows)
+    del rows
+
+    dicts, dict_bytes = measure(lambda: json.loads(body))
+    del dicts
+    # Rows are decoded and dropped as records are built, so only the records stay alive
+    records, record_bytes = measure(lambda: [TaskRecord.from_row(r) for r in json.loads(body)])
+
+    rows = json.loads(body)
+    started = time.perf_counter()
+    records = [TaskRecord.from_row(r) for r in rows]
+    build_time = time.perf_counter() - started
+    started = time.perf_counter()
+    out = [r.to_row() for r in records]
+    serialize_time = time.perf_counter() - started
+    assert out == rows, "TaskRecord round trip changed the JSON rows"
+
+    print(f"tasks:            {task_count}")
+    print(f"dict rows:        {dict_bytes / 2**20:8.1f} MiB ({dict_bytes / task_count:.0f} B/task)")
+    print(f"TaskRecord:       {record_bytes / 2**20:8.1f} MiB ({record_bytes / task_count:.0f} B/task)")
+    print(f"from_row:         {build_time:.3f}s   to_row: {serialize_time:.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    run(parser.parse_args().tasks)
@@ -0,0 +1,76 @@
+"""Persisting added tasks: row-at-a-time inserts vs batched writes, and
+how long an add-tasks call waits with write-behind vs writing inline.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_task_persistence --tasks 20000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import app
+from benchmarks.fake_asana import make_task
+from core.task_persistence import PersistentTaskStore, SQLiteTaskBackend, _row_from_record
+from core.tasks import TaskRecord
+
+NAMESPACE = "bench"
+
+
+def row_at_a_time(path, records):
+    """One INSERT and commit per task, the shape of a naive per-row insert path."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("DELETE FROM tasks WHERE namespace = ?", (NAMESPACE,))
+    conn.commit()
+    for i, record in enumerate(records):
+        conn.execute(
+            "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (NAMESPACE, *_row_from_record(i, record))
+        )
+        conn.commit()
+    conn.close()
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(task_count: int):
+    client = app.AsanaClient_mod("fake-key")
+    records = [TaskRecord.from_row(client.format_task(make_task(i, "1"), str(i))) for i in range(task_count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.db")
+        backend = SQLiteTaskBackend(path)
+        backend.generation(NAMESPACE)  # create the schema
+
+        print(f"tasks: {task_count}")
+        print(f"row-at-a-time inserts:  {timed(lambda: row_at_a_time(path, records)):.3f}s")
+        print(f"batched replace:        {timed(lambda: backend.replace(NAMESPACE, records)):.3f}s")
+
+        persistence = PersistentTaskStore(backend)
+        saved = timed(lambda: persistence.save(NAMESPACE, records))
+        flushed = timed(persistence.flush)
+        print(f"write-behind save:      {saved:.3f}s  (request returns; {flushed:.3f}s more to reach disk)")
+
+        # Saves arriving while a write runs collapse into one write of the latest
+        for _ in range(5):
+            persistence.save(NAMESPACE, records)
+        persistence.close()
+        stats = persistence.stats()
+        print(f"6 saves -> {stats['writes']} writes ({stats['coalesced']} coalesced)")
+
+        reader = PersistentTaskStore(SQLiteTaskBackend(path))
+        reloaded = timed(lambda: reader.sync(NAMESPACE))
+        print(f"reload in another worker: {reloaded:.3f}s for {len(reader.store(NAMESPACE))} tasks")
+        print(f"no-op sync (generation check): {timed(lambda: reader.sync(NAMESPACE)) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=20_000)
+    run(parser.parse_args().tasks)
@@ -0,0 +1,73 @@
+"""Indexed TaskStore queries vs a linear scan over a list of tasks.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_task_store --sizes 10000 100000
+"""
+import argparse
+import time
+from datetime import date
+
+import app
+from benchmarks.fake_asana import make_task
+from core.task_store import TaskStore
+from core.tasks import TaskRecord
+
+QUERIES = {
+    "assignee": {"assignee": "User 3"},
+    "assignee+status": {"assignee": "User 3", "status": "On track"},
+    "priority+due range": {"priority": "High", "due_from": date(2025, 3, 1), "due_to": date(2025, 3, 10)},
+}
+
+
+def scan(records, assignee=..., status=..., priority=..., due_from=None, due_to=None):
+    """The pre-store approach: test every task against every filter."""
+    matches = []
+    for r in records:
+        if assignee is not ... and r.assignee != assignee:
+            continue
+        if status is not ... and r.status != status:
+            continue
+        if priority is not ... and r.priority != priority:
+            continue
+        if due_from is not None and (r.due_date is None or r.due_date < due_from):
+            continue
+        if due_to is not None and (r.due_date is None or r.due_date > due_to):
+            continue
+        matches.append(r)
+    return matches
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run(sizes):
+    client = app.AsanaClient_mod("fake-key")
+    for size in sizes:
+        records = [TaskRecord.from_row(client.format_task(make_task(i, "1"), str(i))) for i in range(size)]
+        started = time.perf_counter()
+        store = TaskStore(records)
+        build = time.perf_counter() - started
+        print(f"{size} tasks (index build {build * 1000:.0f}ms)")
+
+        for label, filters in QUERIES.items():
+            total, page = store.query(**filters)
+            assert total == len(scan(records, **filters)) and page == scan(records, **filters)
+            indexed = best_of(lambda: store.query(**filters, limit=50))
+            linear = best_of(lambda: scan(records, **filters)[:50])
+            print(f"  {label:>20}: {total:6d} hits  index {indexed * 1000:7.2f}ms  scan {linear * 1000:7.2f}ms")
+
+        sorted_page = best_of(lambda: store.query(status="At risk", sort_by="due_date", limit=50))
+        print(f"  {'status, sorted page':>20}: index {sorted_page * 1000:7.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    run(parser.parse_args().sizes)
@@ -0,0 +1,58 @@
+"""Compare HTTP calls and wall time for task updates.
+
+Covers per-task vs /batch writes, each cold (notes must be read first) and
+right after a project load (notes reused from the load). Also checks that a
+note edited remotely after the load is re-read rather than overwritten.
+Run from the backend directory:
+
+    python -m benchmarks.bench_update_tasks --tasks 200 --latency 0.02
+"""
+import argparse
+import time
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+
+
+def run(task_count: int, latency: float):
+    state = FakeAsanaState(task_count=task_count, latency=latency)
+    server, base_url = start_fake_asana(state)
+    app.BASE_URL = base_url
+    rows = [{"ID": t["gid"], "Name": t["name"], "Notes": "Suggested update"} for t in state.tasks["1"]]
+    rows.append({"ID": "missing", "Name": "missing"})
+
+    try:
+        for mode, batch in (("per_task", False), ("batch", True)):
+            for warm in (False, True):
+                client = app.AsanaClient_mod("fake-key", batch_writes=batch)
+                app.response_cache.clear()
+                app.notes_ledger.clear()
+                if warm:
+                    client.get_tasks("1")
+                state.reset_counts()
+                started = time.perf_counter()
+                results = client.update_tasks_from_rows(rows)
+                elapsed = time.perf_counter() - started
+                ok = sum(1 for r in results if r["status"] == 200)
+                assert [r["task_id"] for r in results] == [r["ID"] for r in rows]
+                label = f"{mode} {'after load' if warm else 'cold'}"
+                print(f"{label:>20}: {ok}/{len(rows)} updated, {state.calls['total']} HTTP calls, {elapsed:.3f}s")
+
+        client = app.AsanaClient_mod("fake-key")
+        app.response_cache.clear()
+        client.get_tasks("1")
+        gid = rows[0]["ID"]
+        state.change_task(gid, notes="edited remotely")
+        client.update_tasks_from_rows(rows[:1])
+        assert state.task_index[gid]["notes"].startswith("edited remotely"), "remote notes edit was lost"
+        print("conflict check: remote edit preserved")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake upstream latency per call, seconds")
+    args = parser.parse_args()
+    run(args.tasks, args.latency)
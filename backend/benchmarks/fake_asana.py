@@ -0,0 +1,281 @@
+"""Local stand-in for the Asana REST API, used by the benchmarks.
+
+Serves synthetic workspaces, projects and tasks over HTTP on 127.0.0.1 and
+counts every request it receives, so benchmarks can compare upstream traffic
+without network access or a real API key.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_task(i: int, project_gid: str) -> dict:
+    """Build one synthetic task with the fields format_task reads."""
+    return {
+        "gid": f"{project_gid}{i:06d}",
+        "resource_type": "task",
+        "name": f"Task {i}",
+        "assignee": {"gid": str(i % 7), "name": f"User {i % 7}"} if i % 5 else None,
+        "custom_fields": [
+            {"name": "Priority", "display_value": ("Low", "Medium", "High")[i % 3]},
+            {"name": "Status", "display_value": ("Off track", "At risk", "On track")[i % 3]},
+        ],
+        "followers": [{"gid": str(i % 4), "name": f"User {i % 4}"}],
+        "due_on": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}" if i % 4 else None,
+        "notes": f"Notes for task {i}" if i % 2 else "",
+        "permalink_url": f"https://app.asana.com/0/{project_gid}/{i}",
+    }
+
+
+class FakeAsanaState:
+    """In-memory data and request counters shared by the handler threads."""
+
+    def __init__(
+        self,
+        task_count: int = 100,
+        project_gid: str = "1",
+        latency: float = 0.0,
+        max_page_size: int = 100,
+        rate_limit: int = 0,
+        rate_window: float = 1.0,
+    ):
+        self.latency = latency
+        # Largest page returned regardless of the requested limit, like Asana's cap of 100
+        self.max_page_size = max_page_size
+        # At most rate_limit calls per rate_window seconds (0 = unlimited); more get a 429
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.window_start = time.monotonic()
+        self.window_calls = 0
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.workspaces = [{"gid": "100", "name": "Workspace", "resource_type": "workspace"}]
+        self.projects = {"100": [{"gid": project_gid, "name": "Project", "resource_type": "project"}]}
+        self.tasks = {project_gid: [make_task(i, project_gid) for i in range(task_count)]}
+        self.task_index = {t["gid"]: t for ts in self.tasks.values() for t in ts}
+        # Events sync: a token is an index into event_log; older ones are expired
+        self.event_log = []
+        self.min_sync_token = 0
+        self.events_page_size = 100
+
+    def log_event(self, action: str, task_gid: str, parent_gid: str = None):
+        """Record an Asana-style event; call with the lock held."""
+        event = {"action": action, "resource": {"gid": task_gid, "resource_type": "task"}}
+        if parent_gid:
+            event["parent"] = {"gid": parent_gid, "resource_type": "project"}
+        self.event_log.append(event)
+
+    def change_task(self, task_gid: str, **fields):
+        with self.lock:
+            self.task_index[task_gid].update(fields)
+            self.log_event("changed", task_gid)
+
+    def add_task(self, project_gid: str, i: int, position: int = None) -> dict:
+        with self.lock:
+            task = make_task(i, project_gid)
+            tasks = self.tasks[project_gid]
+            tasks.insert(len(tasks) if position is None else position, task)
+            self.task_index[task["gid"]] = task
+            self.log_event("added", task["gid"], project_gid)
+            return task
+
+    def move_task(self, project_gid: str, task_gid: str, position: int):
+        with self.lock:
+            tasks = self.tasks[project_gid]
+            task = next(t for t in tasks if t["gid"] == task_gid)
+            tasks.remove(task)
+            tasks.insert(position, task)
+            self.log_event("changed", task_gid, project_gid)
+
+    def remove_task(self, project_gid: str, task_gid: str):
+        with self.lock:
+            self.tasks[project_gid] = [t for t in self.tasks[project_gid] if t["gid"] != task_gid]
+            self.log_event("removed", task_gid, project_gid)
+
+    def get_task(self, task_gid: str, fields=None):
+        """Return (status, body) for GET /tasks/{gid}, optionally projected to fields."""
+        task = self.task_index.get(task_gid)
+        if task is None:
+            return 404, {"errors": [{"message": "task not found"}]}
+        if fields:
+            task = {"gid": task["gid"], **{f: task.get(f) for f in fields if f in task}}
+        return 200, {"data": task}
+
+    def put_task(self, task_gid: str, data: dict):
+        """Return (status, body) for PUT /tasks/{gid}."""
+        with self.lock:
+            task = self.task_index.get(task_gid)
+            if task is None:
+                return 404, {"errors": [{"message": "task not found"}]}
+            task.update({k: v for k, v in data.items() if k in ("name", "notes", "due_on")})
+            self.log_event("changed", task_gid)
+            return 200, {"data": dict(task)}
+
+    def expire_sync_tokens(self):
+        with self.lock:
+            self.min_sync_token = len(self.event_log)
+
+    def count(self, key: str):
+        """Count a call; returns the seconds to put in Retry-After if it is rate limited."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.calls[key] += 1
+            self.calls["total"] += 1
+            if not self.rate_limit:
+                return None
+            now = time.monotonic()
+            if now - self.window_start >= self.rate_window:
+                self.window_start, self.window_calls = now, 0
+            self.window_calls += 1
+            if self.window_calls > self.rate_limit:
+                self.calls["rate_limited"] += 1
+                return max(0.0, self.rate_window - (now - self.window_start))
+            return None
+
+    def reset_counts(self):
+        with self.lock:
+            self.calls.clear()
+
+
+def paginate(items, query, full: bool, max_page_size: int = 100):
+    limit = min(int(query.get("limit", ["0"])[0] or 0), max_page_size)
+    offset = int(query.get("offset", ["0"])[0] or 0)
+    if not full:
+        items = [{"gid": i["gid"], "name": i["name"], "resource_type": i["resource_type"]} for i in items]
+    if not limit:
+        return {"data": items[offset:]}
+    page = items[offset:offset + limit]
+    next_offset = offset + limit
+    next_page = {"offset": str(next_offset)} if next_offset < len(items) else None
+    return {"data": page, "next_page": next_page}
+
+
+class FakeAsanaHandler(BaseHTTPRequestHandler):
+    state: FakeAsanaState = None
+    protocol_version = "HTTP/1.1"
+    # Buffer writes so headers and body leave in one segment on keep-alive connections
+    wbufsize = 1 << 16
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, code: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_rate_limited(self, retry_after: float):
+        payload = json.dumps({"errors": [{"message": "Rate limit exceeded"}]}).encode()
+        self.send_response(429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Retry-After", f"{retry_after:.3f}")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [p for p in url.path.split("/") if p][2:]  # strip api/1.0
+        state = self.state
+        full = "opt_fields" in query
+
+        if parts == ["users", "me"]:
+            if (retry := state.count("users/me")) is not None:
+                return self.send_rate_limited(retry)
+            if self.headers.get("Authorization", "").startswith("Bearer invalid"):
+                return self.send_json(401, {"errors": [{"message": "Not Authorized"}]})
+            return self.send_json(200, {"data": {"gid": "1", "name": "Me", "workspaces": state.workspaces}})
+        if parts == ["workspaces"]:
+            if (retry := state.count("workspaces")) is not None:
+                return self.send_rate_limited(retry)
+            return self.send_json(200, paginate(state.workspaces, query, True, state.max_page_size))
+        if parts == ["projects"]:
+            if (retry := state.count("projects")) is not None:
+                return self.send_rate_limited(retry)
+            projects = state.projects.get(query.get("workspace", [""])[0], [])
+            return self.send_json(200, paginate(projects, query, True, state.max_page_size))
+        if len(parts) == 3 and parts[0] == "projects" and parts[2] == "tasks":
+            if (retry := state.count("project_tasks")) is not None:
+                return self.send_rate_limited(retry)
+            tasks = state.tasks.get(parts[1], [])
+            if query.get("opt_fields") == ["gid"]:
+                tasks = [{"gid": t["gid"]} for t in tasks]
+            return self.send_json(200, paginate(tasks, query, full, state.max_page_size))
+        if parts == ["events"]:
+            if (retry := state.count("events")) is not None:
+                return self.send_rate_limited(retry)
+            return self.send_events(query)
+        if len(parts) == 2 and parts[0] == "tasks":
+            if (retry := state.count("task")) is not None:
+                return self.send_rate_limited(retry)
+            fields = query["opt_fields"][0].split(",") if full else None
+            return self.send_json(*state.get_task(parts[1], fields))
+        self.send_json(404, {"errors": [{"message": "unknown route"}]})
+
+    def send_events(self, query):
+        state = self.state
+        with state.lock:
+            latest = str(len(state.event_log))
+            token = query.get("sync", [""])[0]
+            if not token.isdigit() or int(token) < state.min_sync_token or int(token) > len(state.event_log):
+                return self.send_json(412, {"errors": [{"message": "Sync token invalid or too old"}], "sync": latest})
+            start = int(token)
+            page = state.event_log[start:start + state.events_page_size]
+            end = start + len(page)
+            has_more = end < len(state.event_log)
+        self.send_json(200, {"data": page, "sync": str(end), "has_more": has_more})
+
+    def read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_PUT(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p][2:]
+        body = self.read_body()
+        if (retry := self.state.count("task_put")) is not None:
+            return self.send_rate_limited(retry)
+        if len(parts) != 2 or parts[0] != "tasks":
+            return self.send_json(404, {"errors": [{"message": "unknown route"}]})
+        self.send_json(*self.state.put_task(parts[1], body.get("data", {})))
+
+    def do_POST(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p][2:]
+        body = self.read_body()
+        if parts != ["batch"]:
+            return self.send_json(404, {"errors": [{"message": "unknown route"}]})
+        if (retry := self.state.count("batch")) is not None:
+            return self.send_rate_limited(retry)
+
+        actions = body.get("data", {}).get("actions", [])
+        if len(actions) > 10:
+            return self.send_json(400, {"errors": [{"message": "at most 10 actions per batch"}]})
+        results = []
+        for action in actions:
+            path = [p for p in action.get("relative_path", "").split("/") if p]
+            if len(path) != 2 or path[0] != "tasks":
+                code, result = 404, {"errors": [{"message": "unknown route"}]}
+            elif action.get("method") == "get":
+                code, result = self.state.get_task(path[1], action.get("options", {}).get("fields"))
+            elif action.get("method") == "put":
+                code, result = self.state.put_task(path[1], action.get("data", {}))
+            else:
+                code, result = 400, {"errors": [{"message": "unsupported method"}]}
+            results.append({"status_code": code, "headers": {}, "body": result})
+        self.send_json(200, {"data": results})
+
+
+def start_fake_asana(state: FakeAsanaState):
+    """Start the fake API in a daemon thread and return (server, base_url)."""
+    handler = type("Handler", (FakeAsanaHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/api/1.0"
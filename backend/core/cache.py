@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# --- Configuration ---
+DEFAULT_CACHE_SIZE = int(os.getenv("ASANA_CACHE_SIZE", "512"))
+
+# Seconds each kind of Asana resource stays fresh in the cache
+DEFAULT_TTLS = {
+    "workspaces": float(os.getenv("ASANA_CACHE_TTL_WORKSPACES", "600")),
+    "projects": float(os.getenv("ASANA_CACHE_TTL_PROJECTS", "300")),
+    "tasks": float(os.getenv("ASANA_CACHE_TTL_TASKS", "60")),
+}
+
+
+def key_namespace(api_key: str) -> str:
+    """Cache namespace for an API key, so raw keys are never kept as cache keys."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a per-entry TTL.
+
+    Keys are tuples whose second item is the resource name
+    (namespace, resource, *args), which picks the TTL from ``ttls``.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttls: dict = None):
+        self.maxsize = max(1, maxsize)
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        if ttl is None:
+            ttl = self.ttls.get(key[1], 60.0)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_load(self, key, loader, ttl: float = None):
+        """Return the cached value for key, calling loader() and caching it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def invalidate_where(self, predicate):
+        """Drop every entry for which predicate(key, value) is true."""
+        with self._lock:
+            stale = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+            for k in stale:
+                del self._data[k]
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "size": len(self._data), "maxsize": self.maxsize}
+
+
+class Generations:
+    """Thread-safe counters per namespace, bumped whenever its cached data goes stale.
+
+    A load reads the counter before fetching; if it changed by the time the
+    load finishes, the result may predate the change and is not cached.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace) -> int:
+        with self._lock:
+            return self._counts.get(namespace, 0)
+
+    def bump(self, namespace) -> int:
+        with self._lock:
+            self._counts[namespace] = self._counts.get(namespace, 0) + 1
+            return self._counts[namespace]
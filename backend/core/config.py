@@ -1,14 +1,8 @@
 import logging
 import os
-import sys
+import threading
 
-import torch
-import pytesseract
-import tiktoken
 from dotenv import load_dotenv
-from google.cloud import storage
-from supabase import create_client, Client
-from transformers import AutoTokenizer, AutoModel
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +14,11 @@ CHUNK_SIZE = 300
 OVERLAP_SIZE = 50
 TOP_K = 6
 EMBEDDING_MODEL_NAME = "intfloat/e5-large-v2"
-hf_token = os.getenv("HF_TOKEN").strip()   
+hf_token = (os.getenv("HF_TOKEN") or "").strip()
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".xlsx", ".xls", ".pptx", ".ppt", ".html"}
-GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME").strip()
+GCS_BUCKET_NAME = (os.getenv("GCS_BUCKET_NAME") or "").strip()
 GCS_DOCS_PREFIX = "testing/"
-GROQ_API_KEY = os.getenv("GROQ_API_KEY").strip()
+GROQ_API_KEY = (os.getenv("GROQ_API_KEY") or "").strip()
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_MODEL = "llama-3.3-70b-versatile"
 OPENAI_CHAT_MODEL = "gpt-4o-search-preview"
@@ -34,51 +28,136 @@ DEFAULT_TEST_USER_ID = "fd3ff615-b248-4e8f-84f1-ff458bf30d48"
 APP_ENV = os.getenv("APP_ENV", "production")
 
 
+# --- Service factories ---
+# Each one imports its dependency when called, so importing this module stays cheap.
+def init_supabase_client():
+    """Creates the Supabase client."""
+    from supabase import create_client
+
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_KEY")
+    if not supabase_url or not supabase_key:
+        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set.")
+    client = create_client(supabase_url, supabase_key)
+    logger.info("Supabase client initialized.")
+    return client
+
+
+def init_gcs_client():
+    """Creates the Google Cloud Storage client."""
+    from google.cloud import storage
+
+    if not GCS_BUCKET_NAME:
+        raise ValueError("GCS_BUCKET_NAME must be set.")
+    client = storage.Client()
+    logger.info("Google Cloud Storage client initialized.")
+    return client
+
+
+def init_device():
+    import torch
+
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+def init_tokenizer():
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def init_embedding_tokenizer():
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME, token=hf_token or None)
+
+
+def init_embedding_model():
+    """Loads the embedding model onto the configured device."""
+    from transformers import AutoModel
+
+    device = g_vars["device"]
+    logger.info(f"Loading embedding model '{EMBEDDING_MODEL_NAME}' onto device '{device}'")
+    model = AutoModel.from_pretrained(EMBEDDING_MODEL_NAME, token=hf_token or None).to(device).eval()
+    logger.info("Embedding model loaded successfully.")
+    return model
+
+
+def init_tesseract():
+    """Returns pytesseract, with the Tesseract executable path set if provided."""
+    import pytesseract
+
+    tesseract_cmd = os.getenv("TESSERT_CMD")
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        logger.info(f"Tesseract executable path set to: {tesseract_cmd}")
+    return pytesseract
+
+
 # --- Global State & Clients ---
-g_vars = {
-    "supabase": None,
-    "gcs_client": None,
-    "embedding_tokenizer": None,
-    "embedding_model": None,
-    "tokenizer": tiktoken.get_encoding("cl100k_base"),
-    "device": torch.device("cuda" if torch.cuda.is_available() else "cpu")
-}
+class LazyServices:
+    """Dict-like registry that builds each service on first access.
+
+    Every name has its own lock, so a service is constructed exactly once
+    even when several threads ask for it together, and loading one service
+    does not block lookups of others. Assigning a value replaces the
+    service (e.g. a pre-built client) without calling its factory.
+    """
+
+    def __init__(self, factories: dict):
+        self._factories = dict(factories)
+        self._values = {}
+        self._locks = {name: threading.Lock() for name in self._factories}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+            self._values.pop(name, None)
+
+    def __getitem__(self, name: str):
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        if name not in self._factories:
+            raise KeyError(name)
+        with self._locks[name]:
+            # Another thread may have built it while we waited
+            if name not in self._values:
+                self._values[name] = self._factories[name]()
+            return self._values[name]
+
+    def __setitem__(self, name: str, value):
+        with self._lock:
+            self._locks.setdefault(name, threading.Lock())
+            self._factories.setdefault(name, lambda: value)
+            self._values[name] = value
+
+    def __contains__(self, name) -> bool:
+        return name in self._factories
+
+    def get(self, name: str, default=None):
+        return self[name] if name in self._factories else default
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._values
+
+    def loaded(self) -> list:
+        return list(self._values)
+
+
+g_vars = LazyServices({
+    "supabase": init_supabase_client,
+    "gcs_client": init_gcs_client,
+    "embedding_tokenizer": init_embedding_tokenizer,
+    "embedding_model": init_embedding_model,
+    "tokenizer": init_tokenizer,
+    "device": init_device,
+    "tesseract": init_tesseract,
+})
 
 
 def get_g_vars():
     return g_vars
-
-# def init_supabase_client():
-#     """Initializes the Supabase client."""
-#     supabase_url = os.getenv("SUPABASE_URL")
-#     supabase_key = os.getenv("SUPABASE_KEY")
-#     if not supabase_url or not supabase_key:
-#         raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set.")
-#     g_vars["supabase"] = create_client(supabase_url, supabase_key)
-#     logger.info("Supabase client initialized.")
-
-# def init_gcs_client():
-#     """Initializes the Google Cloud Storage client."""
-#     if not GCS_BUCKET_NAME:
-#         raise ValueError("GCS_BUCKET_NAME must be set.")
-#     g_vars["gcs_client"] = storage.Client()
-#     logger.info("Google Cloud Storage client initialized.")
-
-# async def init_embedding_model():
-#     """Loads the embedding model and tokenizer."""
-#     device = g_vars["device"]
-#     logger.info(f"Loading embedding model '{EMBEDDING_MODEL_NAME}' onto device '{device}'")
-#     g_vars["embedding_tokenizer"] = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME, token=hf_token)
-#     g_vars["embedding_model"] = AutoModel.from_pretrained(EMBEDDING_MODEL_NAME, token=hf_token).to(device).eval()
-#     logger.info("Embedding model loaded successfully.")
-
-# def init_tesseract():
-#     """Sets the Tesseract executable path if provided."""
-#     tesseract_cmd = os.getenv("TESSERT_CMD")
-#     if tesseract_cmd:
-#         pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
-#         logger.info(f"Tesseract executable path set to: {tesseract_cmd}")
-
-# def close_clients():
-#     """Placeholder for any client cleanup logic."""
-#     pass
\ No newline at end of file
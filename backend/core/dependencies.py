@@ -13,8 +13,6 @@ async def get_user_id_from_token(request: Request) -> str:
     Raises 401 Unauthorized in production if the token is invalid or missing.
     """
     auth_header = request.headers.get("Authorization")
-    g_vars = get_g_vars()
-    supabase = g_vars["supabase"]
 
     if not auth_header:
         if APP_ENV == "development":
@@ -27,6 +25,8 @@ async def get_user_id_from_token(request: Request) -> str:
         if scheme.lower() != "bearer":
             raise HTTPException(status_code=401, detail="Invalid authentication scheme.")
 
+        # Built on first use; a missing Supabase config fails like a bad token
+        supabase = get_g_vars()["supabase"]
         user_response = await asyncio.to_thread(supabase.auth.get_user, token)
         if not user_response.user:
             raise HTTPException(status_code=401, detail="Invalid or expired token.")
@@ -42,9 +42,8 @@ async def get_user_id_from_token(request: Request) -> str:
 
 async def get_current_user_settings(user_id: str = Depends(get_user_id_from_token)) -> SettingsModel:
     """Retrieves settings for the current user from Supabase."""
-    g_vars = get_g_vars()
-    supabase = g_vars["supabase"]
     try:
+        supabase = get_g_vars()["supabase"]
         response = supabase.table("user_configs").select(
             "bot_name, selected_persona, custom_prompt, answer_styles, meeting_domains"
         ).eq("user_id", user_id).single().execute()
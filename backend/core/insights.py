@@ -0,0 +1,79 @@
+import random
+from datetime import timedelta
+from typing import List, Optional
+
+from core.task_store import TaskStore
+from core.tasks import NO_DUE_DATE, UNASSIGNED
+
+try:
+    import numpy as np
+except ImportError:  # optional: falls back to the pure-Python batch below
+    np = None
+
+PRIORITIES = ("Low", "Medium", "High")
+STATUSES = ("Off track", "At risk", "On track")
+MAX_DUE_SHIFT_DAYS = 5
+
+
+def spiked_insights(store: TaskStore, seed: Optional[int] = None) -> List[dict]:
+    """Suggested updates for every stored task, as JSON rows.
+
+    Due dates move 1-5 days later, priority and status are re-drawn and the
+    notes become a placeholder suggestion. The same seed gives the same
+    suggestions for the same store contents.
+    """
+    # Hold the store lock so a concurrent replace() cannot mix two versions
+    with store.lock:
+        columns = store.columns
+        if not columns["id"]:
+            return []
+        if np is not None:
+            due, priorities, statuses = _draw_numpy(store, seed)
+        else:
+            due, priorities, statuses = _draw_python(columns, seed)
+
+    followers = columns["followers"]
+    assignees = columns["assignee"]
+    return [
+        {
+            "Name": name,
+            "ID": task_id,
+            "Assignee": assignees[i] or UNASSIGNED,
+            "Priority": priorities[i],
+            "Status": statuses[i],
+            "Due Date": due[i],
+            "Followers": ", ".join(followers[i]) if followers[i] else None,
+            "Notes": f"Suggested update for {name}",
+            "Link": link,
+        }
+        for i, (task_id, name, link) in enumerate(zip(columns["id"], columns["name"], columns["link"]))
+    ]
+
+
+def _due_datetime64(columns):
+    # Parsed once per store contents; undated tasks become NaT
+    return np.array([d if d is not None else "NaT" for d in columns["due_date"]], dtype="datetime64[D]")
+
+
+def _draw_numpy(store: TaskStore, seed: Optional[int]):
+    rng = np.random.default_rng(seed)
+    due = store.derived("due_datetime64", _due_datetime64)
+    n = len(due)
+
+    shifted = due + rng.integers(1, MAX_DUE_SHIFT_DAYS + 1, size=n).astype("timedelta64[D]")
+    due_strings = np.where(np.isnat(shifted), NO_DUE_DATE, np.datetime_as_string(shifted, unit="D"))
+    priorities = np.array(PRIORITIES, dtype=object)[rng.integers(0, len(PRIORITIES), size=n)]
+    statuses = np.array(STATUSES, dtype=object)[rng.integers(0, len(STATUSES), size=n)]
+    return due_strings.tolist(), priorities.tolist(), statuses.tolist()
+
+
+def _draw_python(columns, seed: Optional[int]):
+    rng = random.Random(seed)
+    due = [
+        (d + timedelta(days=rng.randint(1, MAX_DUE_SHIFT_DAYS))).isoformat() if d is not None else NO_DUE_DATE
+        for d in columns["due_date"]
+    ]
+    n = len(due)
+    priorities = [rng.choice(PRIORITIES) for _ in range(n)]
+    statuses = [rng.choice(STATUSES) for _ in range(n)]
+    return due, priorities, statuses
@@ -0,0 +1,203 @@
+import contextlib
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+# --- Configuration ---
+# Upper bounds (ms) of the latency histogram buckets; slower requests land in +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# Items logged at DEBUG level when a handler samples a large payload
+LOG_SAMPLE_SIZE = int(os.getenv("ASANA_LOG_SAMPLE_SIZE", "3"))
+
+# "coalesced" counts calls that joined an identical in-flight fetch instead of making their own
+UPSTREAM_FIELDS = ("calls", "bytes", "retries", "rate_limited", "errors", "coalesced")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are estimated from bucket bounds."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (max for the +Inf bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(self.bounds[i]) if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        labels = [str(b) for b in self.bounds] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            "max_ms": round(self.max, 3),
+            "p50_ms": self.quantile(0.5),
+            "p90_ms": self.quantile(0.9),
+            "p99_ms": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class UpstreamCounters:
+    """Asana calls, bytes, retries, 429s, errors and coalesced calls, added to from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(UPSTREAM_FIELDS, 0)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+# Counters of the request being served; None outside a request
+_current_upstream = contextvars.ContextVar("asana_upstream", default=None)
+
+
+def record_upstream(name: str, amount: int = 1):
+    """Count an upstream event against the current request, or as background work."""
+    counters = _current_upstream.get()
+    (counters if counters is not None else metrics.background).incr(name, amount)
+
+
+@contextlib.contextmanager
+def counting_upstream(counters: "UpstreamCounters"):
+    """Count upstream calls made inside the block (and bound from it) into counters."""
+    token = _current_upstream.set(counters)
+    try:
+        yield counters
+    finally:
+        _current_upstream.reset(token)
+
+
+def bind_request(fn):
+    """Wrap fn so calls it makes on another thread keep the current request's context.
+
+    Executor threads do not inherit context variables (upstream counters,
+    rate-limit priority), so worker functions handed to a ThreadPoolExecutor
+    go through this first.
+    """
+    context = contextvars.copy_context()
+
+    def bound(*args, **kwargs):
+        # A copy per call: one Context cannot be entered by two threads at once
+        return context.copy().run(fn, *args, **kwargs)
+
+    return bound
+
+
+class Metrics:
+    """Per-endpoint request counts, latency histograms and upstream totals."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}  # "METHOD /route/{param}" -> stats dict
+        self.background = UpstreamCounters()
+        self.started_at = time.time()
+
+    def observe(self, endpoint: str, status_code: int, elapsed_ms: float, upstream: dict):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    "requests": 0,
+                    "errors": 0,
+                    "latency": Histogram(),
+                    "upstream": dict.fromkeys(UPSTREAM_FIELDS, 0),
+                }
+            stats["requests"] += 1
+            if status_code >= 500:
+                stats["errors"] += 1
+            stats["latency"].observe(elapsed_ms)
+            for name, count in upstream.items():
+                stats["upstream"][name] += count
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = {
+                name: {
+                    "requests": s["requests"],
+                    "errors": s["errors"],
+                    "latency": s["latency"].snapshot(),
+                    "upstream": dict(s["upstream"]),
+                }
+                for name, s in sorted(self._endpoints.items())
+            }
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "endpoints": endpoints,
+            "background_upstream": self.background.snapshot(),
+        }
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request until its last body chunk is sent.
+
+    Requests are grouped by route template (e.g. /api/asana/tasks/{project_id})
+    so path parameters do not create a series per project.
+    """
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counters = UpstreamCounters()
+        token = _current_upstream.set(counters)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_upstream.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.registry.observe(f"{scope['method']} {path}", status_code, elapsed_ms, counters.snapshot())
+
+
+def log_sample(logger: logging.Logger, message: str, items, size: int = LOG_SAMPLE_SIZE):
+    """Log a few randomly chosen items at DEBUG level instead of the whole payload."""
+    if not logger.isEnabledFor(logging.DEBUG) or not items:
+        return
+    sample = random.sample(list(items), min(size, len(items)))
+    logger.debug("%s (%d of %d): %s", message, len(sample), len(items), sample)
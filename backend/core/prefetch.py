@@ -0,0 +1,179 @@
+import contextlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from core.metrics import UpstreamCounters, counting_upstream
+from core.ratelimit import BACKGROUND, priority
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+PREFETCH_ENABLED = os.getenv("ASANA_PREFETCH", "true").lower() in ("1", "true", "yes")
+# Threads running prefetch jobs, kept apart from the request I/O pool
+PREFETCH_WORKERS = int(os.getenv("ASANA_PREFETCH_WORKERS", "2"))
+# Per login: most recently used projects warmed, upstream calls and response bytes spent
+PREFETCH_MAX_PROJECTS = int(os.getenv("ASANA_PREFETCH_MAX_PROJECTS", "3"))
+PREFETCH_MAX_REQUESTS = int(os.getenv("ASANA_PREFETCH_MAX_REQUESTS", "50"))
+PREFETCH_MAX_BYTES = int(os.getenv("ASANA_PREFETCH_MAX_BYTES", str(8 * 1024 * 1024)))
+# Projects remembered per API key, and API keys remembered
+RECENT_PROJECTS_PER_KEY = 10
+MAX_RECENT_KEYS = 1024
+
+
+class PrefetchStopped(Exception):
+    """Raised inside a prefetch job when it is cancelled or out of budget."""
+
+
+class RecentProjects:
+    """Most recently opened projects per API key namespace, newest first."""
+
+    def __init__(self, per_key: int = RECENT_PROJECTS_PER_KEY, max_keys: int = MAX_RECENT_KEYS):
+        self.per_key = per_key
+        self.max_keys = max_keys
+        self._projects = OrderedDict()  # namespace -> OrderedDict(project_gid -> None), oldest first
+        self._lock = threading.Lock()
+
+    def touch(self, namespace: str, project_gid: str):
+        with self._lock:
+            projects = self._projects.setdefault(namespace, OrderedDict())
+            self._projects.move_to_end(namespace)
+            projects[project_gid] = None
+            projects.move_to_end(project_gid)
+            while len(projects) > self.per_key:
+                projects.popitem(last=False)
+            while len(self._projects) > self.max_keys:
+                self._projects.popitem(last=False)
+
+    def get(self, namespace: str) -> list:
+        with self._lock:
+            return list(reversed(self._projects.get(namespace, ())))
+
+
+class PrefetchJob:
+    """One login's warm-up: cancellable, and stopped once it spends its budget."""
+
+    def __init__(self, client, projects: list, max_requests: int, max_bytes: int):
+        self.client = client
+        self.projects = projects
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self.cancelled = threading.Event()
+        self.counters = UpstreamCounters()
+        self.warmed = []
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise PrefetchStopped("cancelled")
+        spent = self.counters.snapshot()
+        if spent["calls"] >= self.max_requests or spent["bytes"] >= self.max_bytes:
+            raise PrefetchStopped("budget spent")
+
+    def run(self):
+        # Background priority: any page load on this key takes rate-limit tokens first
+        with priority(BACKGROUND), counting_upstream(self.counters):
+            self.check()
+            for workspace in self.client.get_workspaces():
+                self.check()
+                self.client.get_projects(workspace["workspace_id"])
+            for project_gid in self.projects:
+                self.check()
+                if self.client.cache.get(self.client.cache_key("tasks", project_gid)) is not None:
+                    continue
+                # Streamed so the budget is checked per task; an abandoned pass caches nothing,
+                # and closing it at once cancels the detail fetches queued ahead
+                with contextlib.closing(self.client.iter_tasks(project_gid, remember_notes=False)) as tasks:
+                    for _ in tasks:
+                        self.check()
+                self.warmed.append(project_gid)
+
+
+class Prefetcher:
+    """Warms a user's workspaces, projects and recent project tasks after login.
+
+    Jobs run on a small dedicated pool at background priority, one per API
+    key namespace. Each stops when cancelled (logout, a newer login with the
+    same key, shutdown) or when it has made max_requests upstream calls or
+    downloaded max_bytes, which also bounds what it adds to the cache. In
+    per-task mode a few detail fetches already queued may still finish, up
+    to twice the client's max_concurrency.
+    """
+
+    def __init__(
+        self,
+        recent: RecentProjects = None,
+        workers: int = PREFETCH_WORKERS,
+        max_projects: int = PREFETCH_MAX_PROJECTS,
+        max_requests: int = PREFETCH_MAX_REQUESTS,
+        max_bytes: int = PREFETCH_MAX_BYTES,
+    ):
+        self.recent = recent if recent is not None else RecentProjects()
+        self.max_projects = max_projects
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="asana-prefetch")
+        self._jobs = {}  # API key namespace -> PrefetchJob
+        self._lock = threading.Lock()
+        self._stats = {
+            "scheduled": 0, "completed": 0, "cancelled": 0, "over_budget": 0, "failed": 0,
+            "projects_warmed": 0, "calls": 0, "bytes": 0,
+        }
+
+    def schedule(self, client) -> PrefetchJob:
+        """Start warming for client's API key, replacing any job already running for it."""
+        namespace = client.cache_namespace
+        projects = self.recent.get(namespace)[: self.max_projects]
+        job = PrefetchJob(client, projects, self.max_requests, self.max_bytes)
+        with self._lock:
+            previous = self._jobs.get(namespace)
+            if previous is not None:
+                previous.cancelled.set()
+            self._jobs[namespace] = job
+            self._stats["scheduled"] += 1
+        self._executor.submit(self._run, namespace, job)
+        return job
+
+    def cancel(self, namespace: str, client=None):
+        """Stop the job for namespace; with client, only if that client started it."""
+        with self._lock:
+            job = self._jobs.get(namespace)
+            if job is None or (client is not None and job.client is not client):
+                return
+            del self._jobs[namespace]
+        job.cancelled.set()
+
+    def shutdown(self):
+        with self._lock:
+            jobs, self._jobs = list(self._jobs.values()), {}
+        for job in jobs:
+            job.cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, namespace: str, job: PrefetchJob):
+        outcome = "completed"
+        try:
+            job.run()
+        except PrefetchStopped as e:
+            outcome = "cancelled" if job.cancelled.is_set() else "over_budget"
+            logger.debug("Prefetch stopped: %s", e)
+        except Exception:
+            outcome = "failed"
+            logger.warning("Prefetch failed", exc_info=True)
+        finally:
+            spent = job.counters.snapshot()
+            with self._lock:
+                if self._jobs.get(namespace) is job:
+                    del self._jobs[namespace]
+                self._stats[outcome] += 1
+                self._stats["projects_warmed"] += len(job.warmed)
+                self._stats["calls"] += spent["calls"]
+                self._stats["bytes"] += spent["bytes"]
+        logger.info(
+            "Prefetch %s: %d projects warmed, %d calls, %d bytes", outcome, len(job.warmed), spent["calls"], spent["bytes"]
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "running": len(self._jobs)}
@@ -0,0 +1,184 @@
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Asana allows 1500 requests per minute per token on paid plans (150 on free ones).
+# These are budgets for the whole deployment; see RATE_LIMIT_WORKERS
+DEFAULT_RATE_PER_MINUTE = float(os.getenv("ASANA_RATE_LIMIT", "1500"))
+DEFAULT_BURST = int(os.getenv("ASANA_RATE_BURST", "50"))
+# Per-key budgets as "<key hash>:<requests per minute>,..."; the hash is key_namespace(api_key)
+RATE_LIMIT_OVERRIDES = os.getenv("ASANA_RATE_LIMIT_OVERRIDES", "")
+# Buckets live in one process, so each worker process gets 1/N of every budget.
+# Defaults to WEB_CONCURRENCY, the worker count uvicorn and gunicorn read
+RATE_LIMIT_WORKERS = max(1, int(os.getenv("ASANA_RATE_LIMIT_WORKERS", os.getenv("WEB_CONCURRENCY", "1"))))
+# Lowest fraction of the budget a bucket backs off to after 429s
+MIN_RATE_FRACTION = 0.1
+# Fraction of the budget regained per second without a 429
+RECOVERY_PER_SECOND = 0.1
+MAX_LIMITERS = 1024
+
+# Priorities, most urgent first: page loads, then bulk sync/writes, then speculative work
+INTERACTIVE = 0
+BULK = 1
+BACKGROUND = 2
+PRIORITY_NAMES = ("interactive", "bulk", "background")
+
+_priority = contextvars.ContextVar("asana_priority", default=INTERACTIVE)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def priority(level: int):
+    """Run the enclosed Asana calls at the given priority."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def at_priority(level: int, fn):
+    """Wrap fn so its Asana calls run at the given priority."""
+
+    def wrapped(*args, **kwargs):
+        with priority(level):
+            return fn(*args, **kwargs)
+
+    return wrapped
+
+
+def parse_overrides(value: str) -> dict:
+    """Parse ASANA_RATE_LIMIT_OVERRIDES into {key hash: requests per minute}."""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        namespace, _, rate = item.partition(":")
+        try:
+            overrides[namespace] = float(rate)
+        except ValueError:
+            logger.warning("Ignoring invalid rate limit override %r", item)
+    return overrides
+
+
+class TokenBucket:
+    """Thread-safe token bucket that serves waiting callers by priority.
+
+    Tokens refill at rate per second up to burst. A caller only takes a
+    token when no more urgent caller is waiting, so bulk traffic yields to
+    interactive requests on the same key. A 429 pauses the bucket for the
+    Retry-After period and halves its rate, which then recovers gradually.
+    """
+
+    def __init__(self, rate_per_minute: float = DEFAULT_RATE_PER_MINUTE, burst: int = DEFAULT_BURST):
+        self.configured_rate = max(rate_per_minute, 1.0) / 60.0
+        self.rate = self.configured_rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._waiting = [0] * len(PRIORITY_NAMES)
+        self._cond = threading.Condition()
+        self._stats = {"acquired": 0, "delayed": 0, "wait_seconds": 0.0, "throttled": 0}
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        self.updated = now
+        if now >= self.paused_until and self.rate < self.configured_rate:
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate * RECOVERY_PER_SECOND * elapsed)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+
+    def acquire(self, level: int = INTERACTIVE) -> float:
+        """Block until a token is granted; returns the seconds spent waiting."""
+        level = min(max(level, 0), len(PRIORITY_NAMES) - 1)
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[level] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    ahead = any(self._waiting[:level])
+                    if not ahead and now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        waited = now - started
+                        self._stats["acquired"] += 1
+                        if waited > 0.001:
+                            self._stats["delayed"] += 1
+                            self._stats["wait_seconds"] += waited
+                        return waited
+                    if now < self.paused_until:
+                        timeout = self.paused_until - now
+                    else:
+                        timeout = max(1 - self.tokens, 0.05) / self.rate
+                    # More urgent callers notify when they take their token
+                    self._cond.wait(timeout)
+            finally:
+                self._waiting[level] -= 1
+                self._cond.notify_all()
+
+    def throttled(self, retry_after: float):
+        """Asana answered 429: hold every caller for retry_after seconds and slow down."""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + retry_after)
+            self.rate = max(self.configured_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.tokens = 0.0
+            self._stats["throttled"] += 1
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                **self._stats,
+                "wait_seconds": round(self._stats["wait_seconds"], 3),
+                "rate_per_minute": round(self.rate * 60, 1),
+                "waiting": dict(zip(PRIORITY_NAMES, self._waiting)),
+            }
+
+
+class RateLimiterRegistry:
+    """One TokenBucket per API key (by key hash), shared by all of that key's sessions.
+
+    Buckets are per process: with several worker processes each takes its
+    share (1 / workers) of the key's rate and burst, so together they stay
+    within the budget Asana allows.
+    """
+
+    def __init__(self, overrides: dict = None, maxsize: int = MAX_LIMITERS, workers: int = RATE_LIMIT_WORKERS):
+        self.overrides = parse_overrides(RATE_LIMIT_OVERRIDES) if overrides is None else dict(overrides)
+        self.maxsize = max(1, maxsize)
+        self.workers = max(1, workers)
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(namespace)
+            if bucket is None:
+                rate = self.overrides.get(namespace, DEFAULT_RATE_PER_MINUTE)
+                bucket = self._buckets[namespace] = TokenBucket(rate / self.workers, DEFAULT_BURST // self.workers)
+                while len(self._buckets) > self.maxsize:
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(namespace)
+            return bucket
+
+    def stats(self) -> dict:
+        with self._lock:
+            buckets = list(self._buckets.values())
+        totals = {"keys": len(buckets), "acquired": 0, "delayed": 0, "wait_seconds": 0.0, "throttled": 0}
+        for bucket in buckets:
+            for name, value in bucket.stats().items():
+                if name in totals:
+                    totals[name] += value
+        totals["wait_seconds"] = round(totals["wait_seconds"], 3)
+        return totals
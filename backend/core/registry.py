@@ -0,0 +1,236 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+except ImportError:  # optional: only the SQLite session store needs it
+    AESGCM = None
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+SESSION_TTL = float(os.getenv("ASANA_SESSION_TTL", str(7 * 24 * 3600)))
+CLIENT_IDLE_TIMEOUT = float(os.getenv("ASANA_CLIENT_IDLE_TIMEOUT", "900"))
+MAX_CLIENTS = int(os.getenv("ASANA_MAX_CLIENTS", "256"))
+# Seconds between idle-client sweeps triggered by lookups
+SWEEP_INTERVAL = 60.0
+# "memory" (default, single worker) or "sqlite:///path/to/sessions.db" (shared by workers on one host)
+SESSION_STORE_URL = os.getenv("ASANA_SESSION_STORE", "memory")
+
+
+# --- Session stores ---
+class InMemorySessionStore:
+    """Session data kept in this process only."""
+
+    def __init__(self):
+        self._data = {}  # token -> (expires_at, data)
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._data[token]
+                return None
+            return entry[1]
+
+    def set(self, token: str, data: dict, ttl: float = SESSION_TTL):
+        now = time.time()
+        with self._lock:
+            # Tokens are only looked up by their own sessions; drop abandoned ones here
+            for expired in [t for t, (expires_at, _) in self._data.items() if expires_at <= now]:
+                del self._data[expired]
+            self._data[token] = (now + ttl, data)
+
+    def delete(self, token: str):
+        with self._lock:
+            self._data.pop(token, None)
+
+
+def _token_id(token: str) -> str:
+    return hashlib.sha256(b"asana-session-id:" + token.encode()).hexdigest()
+
+
+def _session_cipher(token: str):
+    """AES-256-GCM keyed by HKDF of the (random, 256-bit) session token."""
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"asana-session-data").derive(token.encode())
+    return AESGCM(key)
+
+
+def _seal(token: str, data: dict) -> str:
+    nonce = os.urandom(12)
+    sealed = _session_cipher(token).encrypt(nonce, json.dumps(data).encode(), _token_id(token).encode())
+    return base64.b64encode(nonce + sealed).decode()
+
+
+def _unseal(token: str, sealed: str):
+    raw = base64.b64decode(sealed)
+    try:
+        return json.loads(_session_cipher(token).decrypt(raw[:12], raw[12:], _token_id(token).encode()))
+    except (InvalidTag, ValueError):
+        return None
+
+
+class SQLiteSessionStore:
+    """Session data in a SQLite file, so every worker on the host sees the same sessions.
+
+    Rows hold a hash of the token and the data (the API key) encrypted with
+    AES-GCM under a key derived from the token, which only the client has.
+    The file alone reveals neither; it is still created readable by its
+    owner only. Requires the cryptography package.
+    """
+
+    def __init__(self, path: str):
+        if AESGCM is None:
+            raise RuntimeError("The SQLite session store requires the cryptography package")
+        self.path = path
+        self._local = threading.local()
+        if not os.path.exists(path):
+            # SQLite gives the -wal and -shm files the database file's permissions
+            os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sealed_sessions "
+                "(token_id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Zero deleted rows instead of leaving them in free pages
+            conn.execute("PRAGMA secure_delete=ON")
+            self._local.conn = conn
+        return conn
+
+    def get(self, token: str):
+        row = self._connect().execute(
+            "SELECT data FROM sealed_sessions WHERE token_id = ? AND expires_at > ?", (_token_id(token), time.time())
+        ).fetchone()
+        return _unseal(token, row[0]) if row else None
+
+    def set(self, token: str, data: dict, ttl: float = SESSION_TTL):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sealed_sessions (token_id, data, expires_at) VALUES (?, ?, ?)",
+                (_token_id(token), _seal(token, data), time.time() + ttl),
+            )
+            conn.execute("DELETE FROM sealed_sessions WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, token: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sealed_sessions WHERE token_id = ?", (_token_id(token),))
+
+
+def create_session_store(url: str = SESSION_STORE_URL):
+    """Build a session store from a URL: "memory" or "sqlite:///path"."""
+    if url == "memory":
+        return InMemorySessionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported session store: {url}")
+
+
+# --- Client registry ---
+class ClientRegistry:
+    """Per-session API clients, keyed by an opaque session token.
+
+    The store only holds what is needed to rebuild a client (the API key),
+    so any worker sharing the store can serve any session. Live clients,
+    with their own connection pools, are kept per process and closed after
+    idle_timeout seconds without use or when more than max_clients are held.
+    """
+
+    def __init__(self, factory, store=None, idle_timeout: float = CLIENT_IDLE_TIMEOUT, max_clients: int = MAX_CLIENTS):
+        self.factory = factory
+        self.store = store if store is not None else create_session_store()
+        self.idle_timeout = idle_timeout
+        self.max_clients = max(1, max_clients)
+        self._clients = {}  # token -> [client, last_used]
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def create(self, api_key: str, client=None) -> str:
+        """Start a session for api_key and return its token; client reuses an already built one."""
+        token = secrets.token_urlsafe(32)
+        self.store.set(token, {"api_key": api_key})
+        if client is not None:
+            with self._lock:
+                self._clients[token] = [client, time.monotonic()]
+            self.evict_idle()
+        return token
+
+    def get(self, token: str):
+        """Return the client for a session token, or None if the session is unknown."""
+        if not token:
+            return None
+        if time.monotonic() - self._last_sweep > SWEEP_INTERVAL:
+            self.evict_idle()
+        with self._lock:
+            entry = self._clients.get(token)
+            if entry is not None:
+                entry[1] = time.monotonic()
+                return entry[0]
+
+        data = self.store.get(token)
+        if data is None:
+            return None
+        client = self.factory(data["api_key"])
+        with self._lock:
+            # Another request may have built it meanwhile; keep the first one
+            entry = self._clients.setdefault(token, [client, time.monotonic()])
+        self.evict_idle()
+        return entry[0]
+
+    def remove(self, token: str):
+        self.store.delete(token)
+        with self._lock:
+            entry = self._clients.pop(token, None)
+        if entry is not None:
+            close_client(entry[0])
+
+    def evict_idle(self):
+        """Close clients idle past idle_timeout, then the least recently used over max_clients."""
+        now = time.monotonic()
+        with self._lock:
+            self._last_sweep = now
+            idle = [t for t, (_, used) in self._clients.items() if now - used > self.idle_timeout]
+            clients = [self._clients.pop(t)[0] for t in idle]
+            overflow = len(self._clients) - self.max_clients
+            if overflow > 0:
+                # Recently used clients may still have requests in flight, so these
+                # are only dropped; their sessions close once garbage collected
+                for t in sorted(self._clients, key=lambda t: self._clients[t][1])[:overflow]:
+                    del self._clients[t]
+        for client in clients:
+            close_client(client)
+        if clients or overflow > 0:
+            logger.info("Evicted %d idle and %d surplus Asana clients", len(clients), max(0, overflow))
+
+    def clients(self) -> list:
+        """The live clients of this process."""
+        with self._lock:
+            return [client for client, _ in self._clients.values()]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._clients)
+
+
+def close_client(client):
+    session = getattr(client, "session", None)
+    if session is not None:
+        session.close()
@@ -0,0 +1,182 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# --- Configuration ---
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("ASANA_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("ASANA_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("ASANA_BROTLI_QUALITY", "5"))
+# Encoded bodies (and their compressed variants) kept for repeat requests
+ENCODED_CACHE_BYTES = int(os.getenv("ASANA_ENCODED_CACHE_MB", "64")) * 1024 * 1024
+
+
+def dumps(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def choose_encoding(header: Optional[str], size: int) -> Optional[str]:
+    if size < COMPRESS_MIN_BYTES:
+        return None
+    accepted = accepted_encodings(header)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class EncodedBody:
+    """A serialized JSON body with its strong ETag and compressed variants."""
+
+    def __init__(self, source, body: bytes, key=None):
+        self.key = key
+        self.source = source  # what the body was built from; matched by identity
+        self.body = body
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.variants = {}  # content coding -> compressed body
+        self.size = len(body)
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        # Each content coding is its own representation, so it gets its own strong tag
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if If-None-Match names any representation of this body."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            tag = tag[2:] if tag.startswith("W/") else tag
+            if tag.strip('"').split("-")[0] == self.digest:
+                return True
+        return False
+
+
+class EncodedResponseCache:
+    """LRU of EncodedBody by key, bounded by total bytes.
+
+    An entry is reused only while its source is the very same object (a
+    cached task list, a task store version), so a repeat request for
+    unchanged data skips serialization and compression.
+    """
+
+    def __init__(self, max_bytes: int = ENCODED_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def get(self, key, source) -> Optional[EncodedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.source is not source:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, key, source, payload) -> EncodedBody:
+        entry = EncodedBody(source, dumps(payload), key)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+        return entry
+
+    def variant(self, entry: EncodedBody, encoding: str) -> bytes:
+        """The body compressed with encoding, compressed once per entry."""
+        body = entry.variants.get(encoding)
+        if body is None:
+            body = compress(entry.body, encoding)
+            with self._lock:
+                if encoding not in entry.variants:
+                    entry.variants[encoding] = body
+                    entry.size += len(body)
+                    if entry.key is not None and self._entries.get(entry.key) is entry:
+                        self._bytes += len(body)
+                        self._evict()
+        return body
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+
+    def not_modified(self):
+        with self._lock:
+            self._stats["not_modified"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+async def encoded_json_response(request: Request, entry: EncodedBody, cache: EncodedResponseCache) -> Response:
+    """Send entry as JSON: 304 when the client has it, compressed when it asks for that."""
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "private, no-cache"}
+    encoding = choose_encoding(request.headers.get("accept-encoding"), len(entry.body))
+    headers["ETag"] = entry.etag(encoding)
+    if entry.matches(request.headers.get("if-none-match")):
+        cache.not_modified()
+        return Response(status_code=304, headers=headers)
+
+    body = entry.body
+    if encoding is not None:
+        body = entry.variants.get(encoding)
+        if body is None:
+            # Compressing a large body is CPU-bound; keep it off the event loop
+            body = await asyncio.to_thread(cache.variant, entry, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,269 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.config import CHUNK_SIZE, EMBEDDING_MODEL_NAME, OVERLAP_SIZE, TOP_K, get_g_vars
+from core.tasks import EMPTY_NOTES
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# SQLite file holding chunk vectors, shared by workers on one host
+VECTOR_INDEX_PATH = os.getenv("ASANA_VECTOR_INDEX", "asana_vectors.db")
+# Chunks per forward pass of the embedding model
+EMBED_BATCH_SIZE = int(os.getenv("ASANA_EMBED_BATCH_SIZE", "32"))
+# e5 models accept at most 512 tokens
+EMBED_MAX_TOKENS = 512
+
+
+# --- Chunking ---
+def task_text(task: dict) -> str:
+    """The text embedded for a formatted task: its name and notes."""
+    name = task.get("Name") or ""
+    notes = task.get("Notes")
+    if not notes or notes == EMPTY_NOTES:
+        return name
+    return f"{name}\n\n{notes}"
+
+
+def chunk_text(text: str, tokenizer=None, size: int = CHUNK_SIZE, overlap: int = OVERLAP_SIZE) -> List[str]:
+    """Split text into windows of size tokens, each overlapping the previous by overlap tokens."""
+    if not text.strip():
+        return []
+    tokenizer = tokenizer or get_g_vars()["tokenizer"]
+    tokens = tokenizer.encode(text)
+    if len(tokens) <= size:
+        return [text]
+    step = max(1, size - overlap)
+    chunks = []
+    for start in range(0, len(tokens), step):
+        chunks.append(tokenizer.decode(tokens[start:start + size]))
+        if start + size >= len(tokens):
+            break
+    return chunks
+
+
+# --- Embedding ---
+class E5Embedder:
+    """Batched sentence embeddings from the configured e5 model.
+
+    Texts are sorted by length before batching so each batch pads to
+    similar lengths, which is most of the cost on CPU. Returns unit-length
+    float32 vectors in the input order.
+    """
+
+    def __init__(self, batch_size: int = EMBED_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+
+    def __call__(self, texts: List[str], kind: str = "passage") -> np.ndarray:
+        import torch
+
+        g_vars = get_g_vars()
+        tokenizer = g_vars["embedding_tokenizer"]
+        model = g_vars["embedding_model"]
+        device = g_vars["device"]
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.empty((len(texts), model.config.hidden_size), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                encoded = tokenizer(
+                    [f"{kind}: {texts[i]}" for i in batch],  # e5 expects "query: " / "passage: " prefixes
+                    padding=True,
+                    truncation=True,
+                    max_length=EMBED_MAX_TOKENS,
+                    return_tensors="pt",
+                ).to(device)
+                hidden = model(**encoded).last_hidden_state
+                mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                vectors[batch] = torch.nn.functional.normalize(pooled, dim=-1).cpu().numpy()
+        return vectors
+
+
+# --- Index ---
+class TaskVectorIndex:
+    """Persisted top-K index over chunks of Asana tasks.
+
+    Chunks and their vectors are stored in SQLite with a content hash per
+    task, so re-indexing a project only embeds tasks whose name or notes
+    changed and drops tasks that left it. Searches run against an
+    in-memory matrix of all vectors, rebuilt after the index changes.
+    A generation counter per namespace, bumped by every change, tells each
+    worker sharing the SQLite file when its matrix is out of date.
+    Every entry belongs to a namespace (one per API key), and searches only
+    see their own namespace.
+    """
+
+    def __init__(
+        self,
+        path: str = VECTOR_INDEX_PATH,
+        embedder: Optional[Callable] = None,
+        tokenizer=None,
+        model_name: str = EMBEDDING_MODEL_NAME,
+    ):
+        self.path = path
+        self.embedder = embedder or E5Embedder()
+        self.tokenizer = tokenizer
+        self.model_name = model_name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._matrices = {}  # namespace -> (generation, vectors, [(project_gid, task_gid, text)])
+        self._stats = {"embedded_tasks": 0, "embedded_chunks": 0, "unchanged_tasks": 0, "removed_tasks": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS indexed_tasks (namespace TEXT, task_gid TEXT, project_gid TEXT, "
+                    "content_hash TEXT NOT NULL, PRIMARY KEY (namespace, task_gid))"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS chunks (namespace TEXT, task_gid TEXT, chunk_no INTEGER, "
+                    "project_gid TEXT, text TEXT NOT NULL, vector BLOB NOT NULL, "
+                    "PRIMARY KEY (namespace, task_gid, chunk_no))"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS index_generations (namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+                )
+            self._local.conn = conn
+        return conn
+
+    def content_hash(self, text: str) -> str:
+        # The model name is part of the hash, so switching models re-embeds everything
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode()).hexdigest()
+
+    def index_project(self, namespace: str, project_gid: str, tasks: Iterable[dict]) -> Dict[str, int]:
+        """Bring the index for one project in line with its formatted tasks.
+
+        Returns counts of embedded, unchanged and removed tasks and the
+        number of chunks embedded.
+        """
+        texts = {t["ID"]: task_text(t) for t in tasks if t.get("ID")}
+        hashes = {gid: self.content_hash(text) for gid, text in texts.items()}
+
+        conn = self._connect()
+        known = dict(conn.execute(
+            "SELECT task_gid, content_hash FROM indexed_tasks WHERE namespace = ? AND project_gid = ?",
+            (namespace, project_gid),
+        ).fetchall())
+        changed = [gid for gid, h in hashes.items() if known.get(gid) != h]
+        removed = [gid for gid in known if gid not in hashes]
+
+        # Chunk and embed every changed task in one batched pass
+        chunk_rows = []  # (task_gid, chunk_no, text)
+        for gid in changed:
+            for chunk_no, chunk in enumerate(chunk_text(texts[gid], self.tokenizer)):
+                chunk_rows.append((gid, chunk_no, chunk))
+        vectors = self.embedder([text for _, _, text in chunk_rows]) if chunk_rows else None
+
+        with conn:
+            # Changed tasks lose all their old chunks, even ones indexed under another
+            # project; removed ones only those of this project, in case they moved
+            conn.executemany(
+                "DELETE FROM chunks WHERE namespace = ? AND task_gid = ?", ((namespace, gid) for gid in changed)
+            )
+            for table in ("chunks", "indexed_tasks"):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE namespace = ? AND task_gid = ? AND project_gid = ?",
+                    ((namespace, gid, project_gid) for gid in removed),
+                )
+            conn.executemany(
+                "INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (namespace, gid, chunk_no, project_gid, text, np.asarray(vectors[i], dtype=np.float32).tobytes())
+                    for i, (gid, chunk_no, text) in enumerate(chunk_rows)
+                ),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO indexed_tasks VALUES (?, ?, ?, ?)",
+                ((namespace, gid, project_gid, hashes[gid]) for gid in changed),
+            )
+            if changed or removed:
+                conn.execute(
+                    "INSERT INTO index_generations (namespace, generation) VALUES (?, 1) "
+                    "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                    (namespace,),
+                )
+
+        result = {
+            "embedded_tasks": len(changed),
+            "embedded_chunks": len(chunk_rows),
+            "unchanged_tasks": len(hashes) - len(changed),
+            "removed_tasks": len(removed),
+        }
+        with self._lock:
+            for name, count in result.items():
+                self._stats[name] += count
+        logger.info("Indexed project %s: %s", project_gid, result)
+        return result
+
+    def _generation(self, conn: sqlite3.Connection, namespace: str) -> int:
+        row = conn.execute("SELECT generation FROM index_generations WHERE namespace = ?", (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def _load_matrix(self, namespace: str):
+        """(vectors, meta) for namespace, reloaded when any worker has changed its index."""
+        conn = self._connect()
+        with self._lock:
+            cached = self._matrices.get(namespace)
+        if cached is not None and cached[0] == self._generation(conn, namespace):
+            return cached[1:]
+        with conn:
+            # A read transaction, so the generation matches the rows returned
+            conn.execute("BEGIN")
+            generation = self._generation(conn, namespace)
+            rows = conn.execute(
+                "SELECT project_gid, task_gid, text, vector FROM chunks WHERE namespace = ?", (namespace,)
+            ).fetchall()
+        vectors = np.array([np.frombuffer(r[3], dtype=np.float32) for r in rows]) if rows else None
+        with self._lock:
+            current = self._matrices.get(namespace)
+            if current is None or current[0] < generation:
+                self._matrices[namespace] = (generation, vectors, [r[:3] for r in rows])
+        return vectors, [r[:3] for r in rows]
+
+    def search(
+        self, namespace: str, query: str, top_k: Optional[int] = None, project_gid: Optional[str] = None
+    ) -> List[dict]:
+        """Return the top_k (default TOP_K) tasks whose best chunk is most similar to query."""
+        if top_k is None:
+            top_k = TOP_K
+        vectors, meta = self._load_matrix(namespace)
+        if vectors is None or not query.strip() or top_k < 1:
+            return []
+
+        query_vector = self.embedder([query], kind="query")[0]
+        scores = vectors @ query_vector  # unit vectors, so this is cosine similarity
+        if project_gid is not None:
+            scores = np.where([m[0] == project_gid for m in meta], scores, -np.inf)
+
+        # Tasks with several chunks can take several of the best slots, so look
+        # at a few times top_k candidates and widen to a full sort if needed
+        candidates = min(len(scores), top_k * 4)
+        for ranked in (np.argpartition(-scores, candidates - 1)[:candidates], np.arange(len(scores))):
+            hits = {}
+            for j in ranked[np.argsort(-scores[ranked])]:
+                if scores[j] == -np.inf:
+                    break
+                project, task_gid, text = meta[j]
+                if task_gid not in hits:  # keep each task's best chunk only
+                    hits[task_gid] = {"ID": task_gid, "project": project, "score": float(scores[j]), "chunk": text}
+                    if len(hits) == top_k:
+                        return list(hits.values())
+            if candidates == len(scores):
+                break
+        return list(hits.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,174 @@
+import logging
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from core.metrics import record_upstream
+from core.ratelimit import current_priority
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+DEFAULT_POOL_SIZE = int(os.getenv("ASANA_POOL_SIZE", "16"))
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("ASANA_CONNECT_TIMEOUT", "5"))
+DEFAULT_READ_TIMEOUT = float(os.getenv("ASANA_READ_TIMEOUT", "30"))
+DEFAULT_MAX_RETRIES = int(os.getenv("ASANA_MAX_RETRIES", "3"))
+DEFAULT_BACKOFF = float(os.getenv("ASANA_BACKOFF", "0.5"))
+MAX_BACKOFF = 60.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SessionStats:
+    """Thread-safe counters for one pooled session."""
+
+    FIELDS = ("requests", "new_connections", "reused_connections", "retries", "rate_limited", "errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+def _counting_pool(base, stats: SessionStats):
+    """Subclass a urllib3 pool so connection checkouts are counted as new or reused."""
+
+    class CountingPool(base):
+        def _new_conn(self):
+            stats.incr("new_connections")
+            return super()._new_conn()
+
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout)
+            # A pooled connection that was already opened is being reused
+            if getattr(conn, "sock", None) is not None:
+                stats.incr("reused_connections")
+            return conn
+
+    return CountingPool
+
+
+class CountingAdapter(HTTPAdapter):
+    def __init__(self, stats: SessionStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.stats),
+            "https": _counting_pool(HTTPSConnectionPool, self.stats),
+        }
+
+
+def retry_after_seconds(response: requests.Response):
+    """Parse a Retry-After header (seconds or HTTP date); None if absent."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AsanaSession:
+    """Pooled keep-alive HTTP session with timeouts and Retry-After aware retries.
+
+    Every outbound Asana call goes through request(), which retries 429/5xx
+    responses and connection errors up to max_retries times. The wait honours
+    Asana's Retry-After header and otherwise backs off exponentially. With a
+    limiter (a TokenBucket shared by the API key), each attempt first takes a
+    token at the caller's priority, and a 429 pauses the whole bucket.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout=(DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        limiter=None,
+    ):
+        self.timeout = timeout
+        self.limiter = limiter
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.stats = SessionStats()
+
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {api_key}"})
+        adapter = CountingAdapter(self.stats, pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire(current_priority())
+            self.stats.incr("requests")
+            record_upstream("calls")
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                self.stats.incr("errors")
+                record_upstream("errors")
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+                delay = None
+            else:
+                record_upstream("bytes", len(response.content))
+                delay = retry_after_seconds(response)
+                if response.status_code == 429:
+                    self.stats.incr("rate_limited")
+                    record_upstream("rate_limited")
+                    if self.limiter is not None:
+                        # Pause every call on this key, even if this one gives up
+                        self.limiter.throttled(min(self.backoff * (2 ** attempt) if delay is None else delay, MAX_BACKOFF))
+                elif response.status_code >= 500:
+                    record_upstream("errors")
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+
+            if delay is None:
+                delay = self.backoff * (2 ** attempt)
+            delay = min(delay, MAX_BACKOFF)
+            attempt += 1
+            self.stats.incr("retries")
+            record_upstream("retries")
+            logger.warning("Retrying %s %s in %.2fs (attempt %d)", method, url, delay, attempt)
+            # After a 429 the paused bucket already holds the retry back
+            if self.limiter is None or response is None or response.status_code != 429:
+                time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
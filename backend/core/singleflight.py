@@ -0,0 +1,72 @@
+import threading
+
+from core.metrics import record_upstream
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait and receive the same result (or exception). Once it
+    finishes the key is free again, so later calls run afresh.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> _Call in flight
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executed": 0, "shared": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executed"] += 1
+            else:
+                self._stats["shared"] += 1
+
+        if not leader:
+            record_upstream("coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                # forget() may already have replaced it with a newer flight
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def forget(self, key):
+        """Let the next call for key start a new flight instead of joining the current one."""
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def forget_where(self, predicate):
+        with self._lock:
+            for key in [k for k in self._calls if predicate(k)]:
+                del self._calls[key]
+
+    def stats(self) -> dict:
+        """Calls made, calls that ran, and calls saved by sharing an in-flight one."""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# --- Configuration ---
+# Projects whose snapshots are kept for incremental sync
+MAX_SNAPSHOTS = int(os.getenv("ASANA_MAX_SNAPSHOTS", "64"))
+# Force a full resync after this many seconds, to pick up changes events do not
+# report (e.g. a user renaming themselves changes every task's assignee name)
+SNAPSHOT_MAX_AGE = float(os.getenv("ASANA_SNAPSHOT_MAX_AGE", "3600"))
+
+
+class SyncTokenExpired(Exception):
+    """Raised when Asana rejects a sync token (HTTP 412) and a full resync is needed."""
+
+    def __init__(self, new_token: str = None):
+        super().__init__("Asana sync token expired")
+        self.new_token = new_token
+
+
+class ProjectSnapshot:
+    """Formatted tasks of one project, in project order, plus the events sync token."""
+
+    def __init__(self, sync_token: str, tasks):
+        self.sync_token = sync_token
+        self.tasks = OrderedDict((t["ID"], t) for t in tasks)
+        self.synced_at = time.monotonic()
+
+    def is_stale(self, max_age: float = SNAPSHOT_MAX_AGE) -> bool:
+        return time.monotonic() - self.synced_at > max_age
+
+    def apply(self, changed: dict, removed, order=None):
+        """Merge re-fetched tasks (gid -> formatted task) and drop removed gids.
+
+        order is the project's task gids as Asana lists them now. When given,
+        the snapshot is rebuilt in that order (dropping gids it lacks), so
+        inserted and moved tasks sit where a full fetch would put them.
+        """
+        for gid in removed:
+            self.tasks.pop(gid, None)
+        self.tasks.update(changed)
+        if order is not None:
+            self.tasks = OrderedDict((gid, self.tasks[gid]) for gid in order if gid in self.tasks)
+
+    def as_list(self):
+        return list(self.tasks.values())
+
+
+class SnapshotStore:
+    """Bounded LRU of project snapshots with a lock per key for serialized syncs."""
+
+    def __init__(self, maxsize: int = MAX_SNAPSHOTS):
+        self.maxsize = max(1, maxsize)
+        self._snapshots = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def lock_for(self, key) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key):
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+            return snapshot
+
+    def set(self, key, snapshot: ProjectSnapshot):
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.maxsize:
+                old_key, _ = self._snapshots.popitem(last=False)
+                self._locks.pop(old_key, None)
+
+    def discard(self, key):
+        with self._lock:
+            self._snapshots.pop(key, None)
@@ -0,0 +1,283 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date
+from typing import Iterable, List, Optional
+
+from core.task_store import TaskStore
+from core.tasks import TaskRecord
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# "sqlite:///path/to/tasks.db" (default, shared by workers on one host) or "memory"
+TASK_STORE_URL = os.getenv("ASANA_TASK_STORE", "sqlite:///asana_tasks.db")
+# Seconds the writer waits before retrying a failed write
+TASK_WRITE_RETRY_DELAY = float(os.getenv("ASANA_TASK_WRITE_RETRY_DELAY", "1.0"))
+
+
+def write_batch_size(batch_size: Optional[int] = None) -> int:
+    """Rows per INSERT batch; CHUNK_INSERT_BATCH_SIZE unless given."""
+    if batch_size is None:
+        # Imported on first write: core.config loads .env, which the API's import path does not
+        from core.config import CHUNK_INSERT_BATCH_SIZE
+
+        batch_size = CHUNK_INSERT_BATCH_SIZE
+    return max(1, batch_size)
+
+
+# --- Backends ---
+# Tasks are stored per namespace (the key_namespace of the API key that added
+# them), so one user's add-tasks never replaces another's.
+class InMemoryTaskBackend:
+    """Added tasks kept in this process only."""
+
+    def __init__(self):
+        self._records = {}  # namespace -> records
+        self._generations = {}  # namespace -> generation
+        self._lock = threading.Lock()
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def load(self, namespace: str):
+        """Return (generation, records)."""
+        with self._lock:
+            return self._generations.get(namespace, 0), list(self._records.get(namespace, ()))
+
+    def replace(self, namespace: str, records: List[TaskRecord], batch_size: Optional[int] = None) -> int:
+        with self._lock:
+            self._records[namespace] = list(records)
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            return self._generations[namespace]
+
+
+class SQLiteTaskBackend:
+    """Added tasks in a SQLite file (WAL), so they survive restarts and every worker sees them.
+
+    A generation counter per namespace is bumped on every replace, letting
+    readers tell with one cheap query whether their in-memory copy is
+    still current.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tasks (namespace TEXT NOT NULL, position INTEGER NOT NULL, "
+                    "id TEXT, name TEXT, assignee TEXT, priority TEXT, status TEXT, due_date TEXT, followers TEXT, "
+                    "notes TEXT, link TEXT, PRIMARY KEY (namespace, position))"
+                )
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS task_generations (namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+                )
+            self._local.conn = conn
+        return conn
+
+    def _generation(self, conn: sqlite3.Connection, namespace: str) -> int:
+        row = conn.execute("SELECT generation FROM task_generations WHERE namespace = ?", (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def generation(self, namespace: str) -> int:
+        return self._generation(self._connect(), namespace)
+
+    def load(self, namespace: str):
+        """Return (generation, records) from one consistent read."""
+        conn = self._connect()
+        with conn:
+            # A read transaction, so the generation matches the rows returned
+            conn.execute("BEGIN")
+            generation = self._generation(conn, namespace)
+            rows = conn.execute(
+                "SELECT id, name, assignee, priority, status, due_date, followers, notes, link "
+                "FROM tasks WHERE namespace = ? ORDER BY position",
+                (namespace,),
+            ).fetchall()
+        return generation, [_record_from_row(row) for row in rows]
+
+    def replace(self, namespace: str, records: List[TaskRecord], batch_size: Optional[int] = None) -> int:
+        """Swap a namespace's stored tasks for records in one transaction; returns the new generation."""
+        batch_size = write_batch_size(batch_size)
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM tasks WHERE namespace = ?", (namespace,))
+            for start in range(0, len(records), batch_size):
+                conn.executemany(
+                    "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (namespace, *_row_from_record(start + i, r))
+                        for i, r in enumerate(records[start:start + batch_size])
+                    ),
+                )
+            conn.execute(
+                "INSERT INTO task_generations (namespace, generation) VALUES (?, 1) "
+                "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                (namespace,),
+            )
+            return self._generation(conn, namespace)
+
+
+def _row_from_record(position: int, record: TaskRecord) -> tuple:
+    return (
+        position,
+        record.id,
+        record.name,
+        record.assignee,
+        record.priority,
+        record.status,
+        record.due_date.isoformat() if record.due_date else None,
+        json.dumps(record.followers) if record.followers else None,
+        record.notes,
+        record.link,
+    )
+
+
+def _record_from_row(row) -> TaskRecord:
+    task_id, name, assignee, priority, status, due_date, followers, notes, link = row
+    return TaskRecord(
+        id=task_id,
+        name=name,
+        assignee=assignee,
+        priority=priority,
+        status=status,
+        due_date=date.fromisoformat(due_date) if due_date else None,
+        followers=tuple(json.loads(followers)) if followers else (),
+        notes=notes,
+        link=link,
+    )
+
+
+def create_task_backend(url: str = TASK_STORE_URL):
+    """Build a task backend from a URL: "memory" or "sqlite:///path"."""
+    if url == "memory":
+        return InMemoryTaskBackend()
+    if url.startswith("sqlite:///"):
+        return SQLiteTaskBackend(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported task store: {url}")
+
+
+# --- Write-behind ---
+class PersistentTaskStore:
+    """Keeps one TaskStore per namespace in step with a persistent backend.
+
+    save() updates the namespace's in-memory store at once and hands the
+    records to a writer thread, which persists them in batches; if several
+    saves for a namespace arrive while a write is running only the latest
+    is written. sync() reloads a namespace's store when another worker has
+    written a newer generation of it.
+    """
+
+    def __init__(self, backend, batch_size: Optional[int] = None):
+        self.backend = backend
+        self.batch_size = batch_size
+        self._stores = {}  # namespace -> TaskStore
+        self._generations = {}  # namespace -> backend generation its store reflects
+        self._pending = {}  # namespace -> latest records not yet written
+        self._writing = None  # namespace whose records are being written
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stats = {"saves": 0, "writes": 0, "coalesced": 0, "write_errors": 0, "reloads": 0}
+
+    def store(self, namespace: str) -> TaskStore:
+        """The in-memory store for namespace (empty until saved or synced)."""
+        with self._cond:
+            store = self._stores.get(namespace)
+            if store is None:
+                store = self._stores[namespace] = TaskStore()
+            return store
+
+    def save(self, namespace: str, records: Iterable[TaskRecord]):
+        records = list(records)
+        store = self.store(namespace)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Task store is closed")
+            store.replace(records)
+            self._stats["saves"] += 1
+            if namespace in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[namespace] = records
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="task-write-behind", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _busy(self, namespace: str) -> bool:
+        return namespace in self._pending or self._writing == namespace
+
+    def sync(self, namespace: str):
+        """Reload namespace from the backend if it holds a newer generation than the in-memory store."""
+        store = self.store(namespace)
+        with self._cond:
+            if self._busy(namespace):
+                return  # our own unwritten save is the newest data
+            known = self._generations.get(namespace)
+        if known is not None and self.backend.generation(namespace) == known:
+            return
+        generation, records = self.backend.load(namespace)
+        with self._cond:
+            # A save may have landed while loading; it wins over what was read
+            if not self._busy(namespace) and self._generations.get(namespace) == known:
+                store.replace(records)
+                self._generations[namespace] = generation
+                self._stats["reloads"] += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every save has been written; False if timeout ran out first."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and self._writing is None, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Write any pending saves and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                **self._stats,
+                "namespaces": len(self._stores),
+                "tasks": sum(len(store) for store in self._stores.values()),
+                "pending": len(self._pending),
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return  # closed with nothing left to write
+                namespace = next(iter(self._pending))
+                records = self._pending.pop(namespace)
+                self._writing = namespace
+            try:
+                generation = self.backend.replace(namespace, records, self.batch_size)
+            except Exception:
+                logger.exception("Writing %d added tasks failed; retrying", len(records))
+                with self._cond:
+                    self._stats["write_errors"] += 1
+                    self._pending.setdefault(namespace, records)
+                    self._writing = None
+                    if self._closed:
+                        return
+                    self._cond.wait(TASK_WRITE_RETRY_DELAY)
+                continue
+            with self._cond:
+                self._writing = None
+                self._stats["writes"] += 1
+                self._generations[namespace] = generation
+                self._cond.notify_all()
@@ -0,0 +1,135 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from core.tasks import TaskRecord
+
+COLUMNS = ("id", "name", "assignee", "priority", "status", "due_date", "followers", "notes", "link")
+
+# Columns with an equality index (value -> row positions); None is indexed too
+INDEXED_COLUMNS = ("assignee", "status", "priority")
+
+# Sort order matching the frontend table: priorities and statuses by rank, not alphabetically
+SORT_RANKS = {
+    "priority": {"Low": 0, "Medium": 1, "High": 2},
+    "status": {"Off track": 0, "At risk": 1, "On track": 2},
+}
+SORTABLE_COLUMNS = ("name", "assignee", "priority", "status", "due_date")
+
+
+def _sort_positions(positions, column: str, values: list, descending: bool) -> list:
+    """Sort row positions by a column; rows with no value go last either way."""
+    present = [i for i in positions if values[i] is not None]
+    missing = [i for i in positions if values[i] is None]
+    ranks = SORT_RANKS.get(column)
+    if ranks is not None:
+        unranked = len(ranks)
+        key = lambda i: (ranks.get(values[i], unranked), values[i])
+    else:
+        key = values.__getitem__
+    return sorted(present, key=key, reverse=descending) + missing
+
+
+class TaskStore:
+    """Column-per-field task store with secondary indexes.
+
+    Each TaskRecord field is a list aligned by row position. assignee,
+    status and priority have hash indexes and due_date has a sorted index,
+    so filters touch only matching rows instead of scanning every task.
+    """
+
+    def __init__(self, records: Iterable[TaskRecord] = ()):
+        self.lock = threading.RLock()
+        self.replace(records)
+
+    # --- Writes ---
+    def replace(self, records: Iterable[TaskRecord]):
+        """Swap the whole store for records and rebuild the indexes."""
+        columns = {name: [] for name in COLUMNS}
+        for record in records:
+            for name in COLUMNS:
+                columns[name].append(getattr(record, name))
+
+        indexes = {name: {} for name in INDEXED_COLUMNS}
+        for name in INDEXED_COLUMNS:
+            index = indexes[name]
+            for i, value in enumerate(columns[name]):
+                index.setdefault(value, []).append(i)
+
+        # Set views of the same postings for cheap membership tests when intersecting
+        index_sets = {name: {v: frozenset(p) for v, p in index.items()} for name, index in indexes.items()}
+        due_index = sorted((d, i) for i, d in enumerate(columns["due_date"]) if d is not None)
+
+        with self.lock:
+            self.columns = columns
+            self.indexes = indexes
+            self.index_sets = index_sets
+            self.due_dates = [d for d, _ in due_index]
+            self.due_positions = [i for _, i in due_index]
+            self._derived = {}
+
+    # --- Reads ---
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def record(self, i: int) -> TaskRecord:
+        return TaskRecord(*(self.columns[name][i] for name in COLUMNS))
+
+    def derived(self, name: str, build):
+        """Return build(columns), computed once per store contents and cached until replace()."""
+        with self.lock:
+            if name not in self._derived:
+                self._derived[name] = build(self.columns)
+            return self._derived[name]
+
+    def records(self) -> List[TaskRecord]:
+        with self.lock:
+            return [self.record(i) for i in range(len(self))]
+
+    def query(
+        self,
+        assignee=...,
+        status=...,
+        priority=...,
+        due_from: Optional[date] = None,
+        due_to: Optional[date] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[int, List[TaskRecord]]:
+        """Filter, sort and page the store; returns (total matches, page of records).
+
+        Equality filters left as ... are not applied (None matches tasks with
+        no value). due_from/due_to are inclusive and exclude undated tasks.
+        """
+        with self.lock:
+            # Index hits are kept in ascending row order, so filtering the smallest
+            # one by membership in the others yields matches already in store order
+            hits = []  # (positions in row order, same positions as a set)
+            for name, value in (("assignee", assignee), ("status", status), ("priority", priority)):
+                if value is not ...:
+                    hits.append((self.indexes[name].get(value, []), self.index_sets[name].get(value, frozenset())))
+            if due_from is not None or due_to is not None:
+                lo = bisect_left(self.due_dates, due_from) if due_from is not None else 0
+                hi = bisect_right(self.due_dates, due_to) if due_to is not None else len(self.due_dates)
+                in_range = self.due_positions[lo:hi]
+                hits.append((sorted(in_range), set(in_range)))
+
+            if not hits:
+                positions = range(len(self))
+            else:
+                hits.sort(key=lambda hit: len(hit[0]))
+                positions = hits[0][0]
+                for _, members in hits[1:]:
+                    positions = [i for i in positions if i in members]
+
+            if sort_by is not None:
+                if sort_by not in SORTABLE_COLUMNS:
+                    raise ValueError(f"Cannot sort by {sort_by}")
+                positions = _sort_positions(positions, sort_by, self.columns[sort_by], descending)
+
+            total = len(positions)
+            end = None if limit is None else offset + limit
+            return total, [self.record(i) for i in positions[offset:end]]
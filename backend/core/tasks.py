@@ -0,0 +1,75 @@
+import sys
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Tuple
+
+# Placeholders used by the JSON rows the frontend reads and sends back
+UNASSIGNED = "Unassigned"
+NOT_SET = "Not set"
+NO_DUE_DATE = "No due date"
+EMPTY_NOTES = "(empty)"
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Assignees, priorities and statuses repeat across tasks; share one string each
+    return sys.intern(value) if value else None
+
+
+def parse_due_date(value) -> Optional[date]:
+    if not value or value == NO_DUE_DATE:
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    """Compact task with real values; None where the JSON row shows a placeholder."""
+
+    id: Optional[str]
+    name: Optional[str]
+    assignee: Optional[str] = None
+    priority: Optional[str] = None
+    status: Optional[str] = None
+    due_date: Optional[date] = None
+    followers: Tuple[str, ...] = ()
+    notes: Optional[str] = None
+    link: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "TaskRecord":
+        """Build a record from a JSON row in the shape format_task returns."""
+        assignee = row.get("Assignee")
+        priority = row.get("Priority")
+        status = row.get("Status")
+        notes = row.get("Notes")
+        followers = row.get("Followers")
+        return cls(
+            id=row.get("ID"),
+            name=row.get("Name"),
+            assignee=_intern(None if assignee == UNASSIGNED else assignee),
+            priority=_intern(None if priority == NOT_SET else priority),
+            status=_intern(None if status == NOT_SET else status),
+            due_date=parse_due_date(row.get("Due Date")),
+            followers=tuple(_intern(f) for f in followers.split(", ")) if followers else (),
+            notes=None if notes == EMPTY_NOTES else notes or None,
+            link=row.get("Link"),
+        )
+
+    def to_row(self) -> dict:
+        """Serialize to the JSON row shape the API has always returned."""
+        return {
+            "Name": self.name,
+            "ID": self.id,
+            "Assignee": self.assignee or UNASSIGNED,
+            "Priority": self.priority or NOT_SET,
+            "Status": self.status or NOT_SET,
+            "Due Date": self.due_date.isoformat() if self.due_date else NO_DUE_DATE,
+            "Followers": ", ".join(self.followers) if self.followers else None,
+            "Notes": self.notes or EMPTY_NOTES,
+            "Link": self.link,
+        }
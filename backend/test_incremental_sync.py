@@ -0,0 +1,69 @@
+"""Incremental project sync must return exactly what a full fetch returns.
+
+Runs against the recorded local stub of the Asana API in benchmarks.fake_asana.
+"""
+import pytest
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+from core.cache import TTLCache
+from core.ratelimit import TokenBucket
+
+
+@pytest.fixture
+def asana(monkeypatch):
+    state = FakeAsanaState(task_count=250)
+    server, base_url = start_fake_asana(state)
+    monkeypatch.setattr(app, "BASE_URL", base_url)
+    monkeypatch.setattr(app, "project_snapshots", app.SnapshotStore())
+    yield state
+    server.shutdown()
+
+
+def load(state, incremental: bool, bulk: bool = True):
+    # A fresh cache per load, so every call goes upstream; no client-side rate limit
+    client = app.AsanaClient_mod(
+        "test-key", cache=TTLCache(), bulk_projection=bulk, rate_limiter=TokenBucket(1e6, 1000)
+    )
+    return client.get_tasks("1", incremental=incremental)
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_incremental_matches_full_fetch(asana, bulk):
+    load(asana, incremental=True, bulk=bulk)
+    gids = [t["gid"] for t in asana.tasks["1"]]
+
+    asana.change_task(gids[0], notes="edited")
+    asana.add_task("1", 250)
+    asana.add_task("1", 251, position=120)
+    asana.move_task("1", gids[5], 0)
+    asana.remove_task("1", gids[-1])
+
+    assert load(asana, incremental=True, bulk=bulk) == load(asana, incremental=False, bulk=bulk)
+
+
+def test_no_events_skips_refetch(asana):
+    first = load(asana, incremental=True)
+    asana.reset_counts()
+    assert load(asana, incremental=True) == first
+    assert asana.calls["project_tasks"] == 0 and asana.calls["task"] == 0
+
+
+def test_expired_token_resyncs(asana):
+    load(asana, incremental=True)
+    asana.change_task(asana.tasks["1"][1]["gid"], name="renamed")
+    asana.expire_sync_tokens()
+
+    assert load(asana, incremental=True) == load(asana, incremental=False)
+
+
+@pytest.mark.parametrize("incremental", [True, False])
+def test_task_deleted_after_listing_is_skipped(asana, incremental):
+    load(asana, incremental=incremental, bulk=False)
+    gid = asana.tasks["1"][3]["gid"]
+    asana.change_task(gid, notes="edited")
+    # Still listed on the project, but its detail read now gets a 404
+    del asana.task_index[gid]
+
+    tasks = load(asana, incremental=incremental, bulk=False)
+    assert len(tasks) == 249 and gid not in {t["ID"] for t in tasks}
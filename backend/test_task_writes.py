@@ -0,0 +1,99 @@
+"""Task writes must never lose or hide notes.
+
+Runs against the recorded local stub of the Asana API in benchmarks.fake_asana.
+"""
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from benchmarks.fake_asana import FakeAsanaState, start_fake_asana
+from core.cache import TTLCache
+from core.ratelimit import TokenBucket
+
+
+@pytest.fixture
+def asana(monkeypatch):
+    state = FakeAsanaState(task_count=250)
+    server, base_url = start_fake_asana(state)
+    monkeypatch.setattr(app, "BASE_URL", base_url)
+    monkeypatch.setattr(app, "notes_ledger", TTLCache(ttls={"notes": 600, "notes_sync": 600}))
+    yield state
+    server.shutdown()
+
+
+def make_client(**kwargs):
+    # A cache of its own and no client-side rate limit
+    return app.AsanaClient_mod("test-key", cache=TTLCache(), rate_limiter=TokenBucket(1e6, 1000), **kwargs)
+
+
+def test_write_during_load_is_not_hidden(asana):
+    client = make_client()
+    gid = asana.tasks["1"][0]["gid"]
+    asana.latency = 0.05
+    loader = threading.Thread(target=client.get_tasks, args=("1",))
+    loader.start()
+    time.sleep(0.1)  # the load is past its first page
+
+    assert client.update_task(gid, {"notes": "NEW"})["status"] == 200
+    loader.join()
+    asana.latency = 0.0
+
+    assert asana.task_index[gid]["notes"] == "NEW"
+    assert client.get_tasks("1")[0]["Notes"] == "NEW"
+
+
+def test_unreadable_task_reports_asana_error(asana):
+    token = app.client_registry.create("test-key", make_client())
+    with TestClient(app.app) as http:
+        response = http.post(
+            "/api/asana/update-tasks",
+            json={"ID": "nope", "updates": {"notes": "x"}},
+            headers={app.SESSION_HEADER: token},
+        )
+    assert response.status_code == 200
+    assert "task not found" in response.json()
+    assert asana.calls["task_put"] == 0
+
+
+@pytest.mark.parametrize("batch_writes", [True, False])
+def test_remote_notes_edit_after_load_is_kept(asana, batch_writes):
+    client = make_client(batch_writes=batch_writes)
+    rows = client.get_tasks("1")[:3]
+    gid = rows[0]["ID"]
+    asana.change_task(gid, notes="edited remotely")
+    for row in rows:
+        row["Notes"] = "suggestion"
+
+    results = client.update_tasks_from_rows(rows)
+
+    assert [r["status"] for r in results] == [200, 200, 200]
+    notes = asana.task_index[gid]["notes"]
+    assert notes.startswith("edited remotely") and notes.endswith("suggestion")
+
+
+@pytest.mark.parametrize("batch_writes", [True, False])
+def test_failed_notes_read_never_writes(asana, monkeypatch, batch_writes):
+    unreadable = asana.tasks["1"][1]["gid"]
+    get_task = asana.get_task
+
+    def flaky_get_task(task_gid, fields=None):
+        if fields and task_gid == unreadable:
+            return 503, {"errors": [{"message": "unavailable"}]}
+        return get_task(task_gid, fields)
+
+    monkeypatch.setattr(asana, "get_task", flaky_get_task)
+    client = make_client(batch_writes=batch_writes)
+    client.session.backoff = 0.0
+    rows = [client.format_task(t, t["gid"]) for t in asana.tasks["1"][:3]]
+    before = asana.task_index[unreadable]["notes"]
+    for row in rows:
+        row["Notes"] = "suggestion"
+
+    results = client.update_tasks_from_rows(rows)
+
+    assert [r["task_id"] for r in results] == [row["ID"] for row in rows]
+    assert [r["status"] for r in results] == [200, 503, 200]
+    assert asana.task_index[unreadable]["notes"] == before